@@ -0,0 +1,85 @@
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger("GoGiTracker")
+
+
+class AssignmentSyncWorker:
+    """
+    Background thread that keeps users' GitHub assignment lists up to date.
+
+    Every `interval` seconds it calls `sync_user(user_id)` for each id returned by
+    `due_users()`, which includes users whose refresh was requested through the database,
+    so any process can queue one. Ids passed to request() are synced as soon as the
+    thread is free. Both callables run inside an application context of `app`.
+    """
+
+    def __init__(self, app, sync_user, due_users, interval):
+        self.app = app
+        self.sync_user = sync_user
+        self.due_users = due_users
+        self.interval = interval
+        self._requests = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="assignment-sync", daemon=True)
+        self._thread.start()
+        logger.info("Assignment sync worker started (interval %ss).", self.interval)
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._requests.put(None)  # Wake the thread up
+        if self._thread:
+            self._thread.join(timeout)
+            if not self._thread.is_alive():
+                self._stop.clear()  # Or later run_once() calls would sync nobody
+        self._thread = None
+
+    def join(self, timeout=None):
+        """Waits at most `timeout` seconds for the thread to end."""
+        thread = self._thread
+        if thread:
+            thread.join(timeout)
+
+    def request(self, user_id):
+        """Queues an on-demand sync of one user."""
+        self._requests.put(user_id)
+
+    def run_once(self):
+        """Syncs every user that is due. Returns the number of users synced."""
+        with self.app.app_context():
+            user_ids = self.due_users()
+        for user_id in user_ids:
+            if self._stop.is_set():
+                break
+            self._sync(user_id)
+        return len(user_ids)
+
+    def _sync(self, user_id):
+        with self.app.app_context():
+            try:
+                self.sync_user(user_id)
+            except Exception as e:
+                logger.error("Assignment sync failed for user %s: %s", user_id, e)
+
+    def _run(self):
+        next_pass = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                user_id = self._requests.get(timeout=max(next_pass - time.monotonic(), 0))
+                if user_id is not None:
+                    self._sync(user_id)
+            except queue.Empty:
+                self.run_once()
+                next_pass = time.monotonic() + self.interval
@@ -0,0 +1,312 @@
+import base64
+import logging
+import re
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+logger = logging.getLogger("GoGiTracker")
+
+# The "Review Assignment Due Date" badge GitHub Classroom puts at the top of assignment READMEs
+CLASSROOM_BUTTON_PATTERN = re.compile(
+    r'\[!\[Review Assignment Due Date\]\(https://classroom\.github\.com/assets/.*?\.svg\)\]\((https://classroom\.github\.com/a/[a-zA-Z0-9]+)\)'
+)
+
+
+# One page of the authenticated user's repositories (the ones /user/repos lists) with the
+# blob of their README.md, for the GitHub GraphQL API
+REPOSITORIES_QUERY = """
+query($cursor: String) {
+  viewer {
+    repositories(first: 100, after: $cursor, affiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER],
+                 ownerAffiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER]) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        url
+        pushedAt
+        owner { login }
+        object(expression: "HEAD:README.md") { ... on Blob { oid text } }
+      }
+    }
+  }
+}
+"""
+
+
+class GitHubAPIError(Exception):
+    """Raised when the GitHub API answers a request with an unexpected status."""
+
+    def __init__(self, response):
+        super().__init__(f"GitHub API returned {response.status_code}: {response.text}")
+        self.response = response
+
+
+class RateLimitError(GitHubAPIError):
+    """Raised when GitHub refuses a request because the API rate limit is exhausted."""
+
+    @property
+    def retry_at(self):
+        """When GitHub will accept requests again, from Retry-After or X-RateLimit-Reset."""
+        headers = self.response.headers
+        if headers.get('Retry-After', '').isdigit():
+            return datetime.now() + timedelta(seconds=int(headers['Retry-After']))
+        if headers.get('X-RateLimit-Reset', '').isdigit():
+            return datetime.fromtimestamp(int(headers['X-RateLimit-Reset']))
+        return datetime.now() + timedelta(minutes=1)
+
+
+def is_rate_limited(response):
+    """Whether a GitHub response is a primary or secondary rate limit refusal."""
+    return response.status_code in (403, 429) and (
+        response.headers.get('X-RateLimit-Remaining') == '0' or 'Retry-After' in response.headers
+    )
+
+
+def iter_user_repos(get, per_page=100, request_timeout=10):
+    """
+    Lazily yields every repository of the authenticated user, following the
+    `Link: rel="next"` pagination headers of /user/repos.
+
+    Only one page is held in memory at a time, and the first repositories are
+    yielded before the later pages have been requested, so callers can start
+    working on them straight away.
+    """
+    url = '/user/repos'
+    params = {'per_page': per_page}
+    while url:
+        response = get(url, params=params, timeout=request_timeout)
+        if is_rate_limited(response):
+            raise RateLimitError(response)
+        if response.status_code != 200:
+            raise GitHubAPIError(response)
+
+        yield from response.json()
+
+        # The next link already carries the query string
+        url = response.links.get('next', {}).get('url')
+        params = None
+
+
+def iter_user_repos_graphql(post, request_timeout=10):
+    """
+    Lazily yields every repository of the authenticated user like iter_user_repos(), 100
+    per GraphQL request, each with its README.md under 'readme' ({'sha', 'text'}, or
+    None when there is none), so no request per repository is needed.
+    """
+    cursor = None
+    while True:
+        response = post('/graphql', json={'query': REPOSITORIES_QUERY, 'variables': {'cursor': cursor}},
+                        timeout=request_timeout)
+        if is_rate_limited(response):
+            raise RateLimitError(response)
+        if response.status_code != 200:
+            raise GitHubAPIError(response)
+
+        body = response.json()
+        errors = body.get('errors') or []
+        if any(error.get('type') == 'RATE_LIMITED' for error in errors):
+            raise RateLimitError(response)
+        if not body.get('data'):
+            raise GitHubAPIError(response)
+        for error in errors:  # E.g. a repository that could not be resolved; the others are still listed
+            logger.warning("GitHub GraphQL error: %s", error.get('message'))
+
+        repositories = body['data']['viewer']['repositories']
+        for node in repositories['nodes']:
+            blob = node.get('object')  # Empty for a README.md that is not a file
+            yield {
+                'name': node['name'],
+                'owner': node['owner'],
+                'html_url': node['url'],
+                'pushed_at': node['pushedAt'],
+                'readme': {'sha': blob['oid'], 'text': blob.get('text')} if blob else None,
+            }
+
+        if not repositories['pageInfo']['hasNextPage']:
+            return
+        cursor = repositories['pageInfo']['endCursor']
+
+
+def find_classroom_url(readme_text):
+    """
+    Returns the GitHub Classroom assignment URL from a README's deadline button,
+    or None if the README has no such button.
+    """
+    match = CLASSROOM_BUTTON_PATTERN.search(readme_text)
+    return match.group(1) if match else None
+
+
+def fetch_readmes(get, repos, max_workers=8, request_timeout=10, budget=30, skip=None):
+    """
+    Lazily yields (repo, result) for every repository, in the order of `repos`, where
+    result is the README response or the exception raised for that repository.
+
+    README requests run concurrently on a bounded thread pool. `repos` may be a lazy
+    iterable such as iter_user_repos(): it is consumed only as results are taken, with
+    at most 2 * `max_workers` repositories in flight, so memory stays bounded however
+    many repositories there are and the first results arrive while later pages are
+    still unread. `get` is called as get(url, timeout=request_timeout) and must be safe
+    to call from worker threads. Repositories for which skip(repo) is true are yielded
+    with None and no request. Once `budget` seconds have passed, requests still running
+    are abandoned and later repositories are not fetched; both are reported as
+    TimeoutError, so one slow repository cannot hold up the whole page.
+    """
+    deadline = time.monotonic() + budget
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="readme-fetch")
+    in_flight = deque()  # (repo, future), or (repo, result) for repositories not fetched
+
+    def result(repo, future):
+        if not isinstance(future, Future):
+            return repo, future
+        wait([future], timeout=max(deadline - time.monotonic(), 0))
+        if not future.done():
+            future.cancel()
+            return repo, TimeoutError(f"README not fetched within {budget} seconds")
+        if future.cancelled():
+            return repo, TimeoutError("README fetch cancelled")
+        if future.exception() is not None:
+            return repo, future.exception()
+        return repo, future.result()
+
+    try:
+        for repo in repos:
+            if skip and skip(repo):
+                future = None
+            elif time.monotonic() >= deadline:
+                future = TimeoutError(f"README not fetched within {budget} seconds")
+            else:
+                owner = repo.get('owner', {}).get('login', 'Unknown')
+                repo_name = repo.get('name', 'Unknown')
+                future = executor.submit(get, f'/repos/{owner}/{repo_name}/contents/README.md',
+                                         timeout=request_timeout)
+            in_flight.append((repo, future))
+            if len(in_flight) >= 2 * max_workers:
+                yield result(*in_flight.popleft())
+        while in_flight:
+            yield result(*in_flight.popleft())
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def categorize_repos(get, repos, known=None, **fetch_options):
+    """
+    Splits repositories into (assignments_with_deadlines, other_projects).
+
+    Assignments are repositories whose README carries the Classroom deadline button.
+    Repositories whose README could not be fetched are listed as other projects with
+    an 'error' entry, so partial results can still be rendered. Errors raised while
+    iterating `repos` itself (e.g. GitHubAPIError) propagate to the caller, and so does
+    RateLimitError for a rate-limited README request, since the remaining answers would
+    be refusals rather than READMEs.
+
+    `known` maps a repository's html_url to what a previous run found for it
+    ({'pushed_at', 'readme_sha', 'classroom_url'}). Repositories whose pushed_at has not
+    moved reuse that result without any request, and READMEs whose blob sha is
+    unchanged are not decoded or scanned again. Every entry returned carries its
+    'pushed_at' and 'readme_sha' so callers can store them for the next run.
+    """
+    known = known or {}
+    assignments_with_deadlines = []
+    other_projects = []
+    count = reused = 0
+
+    def listed_repos():
+        # Only what classification needs, so full /user/repos entries are dropped with their page
+        for repo in repos:
+            yield {'name': repo.get('name', 'Unknown'), 'owner': {'login': repo.get('owner', {}).get('login')},
+                   'html_url': repo.get('html_url', '#'), 'pushed_at': repo.get('pushed_at')}
+
+    def unchanged(repo):
+        previous = known.get(repo['html_url'])
+        return bool(previous and repo['pushed_at'] and previous['pushed_at'] == repo['pushed_at'])
+
+    # Each repository is classified as soon as its README arrives, and the response dropped
+    for repo, readme_response in fetch_readmes(get, listed_repos(), skip=unchanged, **fetch_options):
+        count += 1
+        repo_name = repo['name']
+        repo_url = repo['html_url']
+        entry = {'name': repo_name, 'pushed_at': repo['pushed_at'], 'readme_sha': None}
+
+        if readme_response is None:
+            previous = known[repo_url]
+            reused += 1
+            entry['readme_sha'] = previous['readme_sha']
+            assignment_url = previous['classroom_url']
+        else:
+            if not isinstance(readme_response, Exception) and is_rate_limited(readme_response):
+                raise RateLimitError(readme_response)
+
+            try:
+                if isinstance(readme_response, Exception):
+                    raise readme_response
+
+                assignment_url = None
+                if readme_response.status_code == 200:
+                    readme = readme_response.json()
+                    entry['readme_sha'] = readme.get('sha')
+                    last_seen = known.get(repo_url)
+                    if entry['readme_sha'] and last_seen and last_seen['readme_sha'] == entry['readme_sha']:
+                        # Same README blob as last time: its classification still holds
+                        reused += 1
+                        assignment_url = last_seen['classroom_url']
+                    else:
+                        # Decode the README content (Base64)
+                        readme_decoded = base64.b64decode(readme.get('content', '')).decode('utf-8')
+                        assignment_url = find_classroom_url(readme_decoded)
+                else:
+                    logger.debug("Repository '%s' has no README.", repo_name)
+
+            except Exception as e:
+                # Without pushed_at the repository is retried on the next run
+                other_projects.append({**entry, 'url': repo_url, 'pushed_at': None, 'error': str(e)})
+                logger.error("Error processing repository '%s': %s", repo_name, e)
+                continue
+
+        add_categorized(entry, repo_url, assignment_url, assignments_with_deadlines, other_projects)
+
+    logger.debug("Categorized %s repositories, %s reused from the previous run.", count, reused)
+    return assignments_with_deadlines, other_projects
+
+
+def categorize_graphql_repos(repos, known=None):
+    """
+    categorize_repos() for repositories from iter_user_repos_graphql(), whose README came
+    with the listing, so no further requests are made. READMEs whose blob sha is the one
+    recorded in `known` are not scanned again. Returns entries in the same shape, so the
+    two can be used interchangeably from one run to the next.
+    """
+    known = known or {}
+    assignments_with_deadlines = []
+    other_projects = []
+    count = reused = 0
+
+    for repo in repos:
+        count += 1
+        repo_url = repo['html_url']
+        readme = repo['readme']
+        entry = {'name': repo['name'], 'pushed_at': repo['pushed_at'], 'readme_sha': readme and readme['sha']}
+        last_seen = known.get(repo_url)
+
+        if not readme:
+            assignment_url = None
+            logger.debug("Repository '%s' has no README.", repo['name'])
+        elif last_seen and last_seen['readme_sha'] == readme['sha']:
+            reused += 1
+            assignment_url = last_seen['classroom_url']
+        else:
+            assignment_url = find_classroom_url(readme['text'] or '')  # No text for binary blobs
+        add_categorized(entry, repo_url, assignment_url, assignments_with_deadlines, other_projects)
+
+    logger.debug("Categorized %s repositories, %s reused from the previous run.", count, reused)
+    return assignments_with_deadlines, other_projects
+
+
+def add_categorized(entry, repo_url, assignment_url, assignments_with_deadlines, other_projects):
+    if assignment_url:
+        assignments_with_deadlines.append({**entry, 'github_url': repo_url, 'classroom_url': assignment_url})
+        logger.debug("Repository '%s' has a Classroom deadline link.", entry['name'])
+    else:
+        other_projects.append({**entry, 'url': repo_url})
+        logger.debug("Repository '%s' has no Classroom deadline link.", entry['name'])
@@ -0,0 +1,102 @@
+import os
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+DEFAULT_DATABASE_URL = 'sqlite:///../users.db'
+
+# Engine settings read from the environment when set there, else from config.py, with
+# their types and defaults. Timeouts are in seconds except the statement timeout (ms, 0 = none).
+DATABASE_SETTINGS = {
+    'DATABASE_POOL_SIZE': (int, 5),
+    'DATABASE_MAX_OVERFLOW': (int, 10),
+    'DATABASE_POOL_TIMEOUT': (int, 30),
+    'DATABASE_POOL_RECYCLE': (int, 30 * 60),
+    'DATABASE_STATEMENT_TIMEOUT': (int, 0),
+}
+
+# Tuning applied to every new SQLite connection of the production profile
+PRODUCTION_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',  # Readers no longer block the writer, nor the writer the readers
+    'synchronous': 'NORMAL',  # Durable with WAL; fsync only at checkpoints instead of every commit
+    'busy_timeout': 5000,  # ms a writer waits for the lock before failing with "database is locked"
+    'cache_size': -64000,  # 64 MB page cache per connection (negative values are KiB)
+    'mmap_size': 256 * 1024 * 1024,  # Read pages through a 256 MB memory map instead of read() calls
+    'temp_store': 'MEMORY',
+}
+
+
+def normalize_database_url(url):
+    """Accepts the postgres:// scheme used by Heroku-style hosts, which SQLAlchemy 1.4 rejects."""
+    if url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def load_database_config(config, environ=os.environ):
+    """
+    Fills in SQLALCHEMY_DATABASE_URI and the DATABASE_* engine settings. DATABASE_URL
+    and DATABASE_* environment variables take precedence over config.py, so the same
+    build can run against the SQLite file locally and against Postgres in deployment.
+    """
+    url = environ.get('DATABASE_URL') or config.get('SQLALCHEMY_DATABASE_URI') or DEFAULT_DATABASE_URL
+    config['SQLALCHEMY_DATABASE_URI'] = normalize_database_url(url)
+    for name, (cast, default) in DATABASE_SETTINGS.items():
+        if environ.get(name):
+            config[name] = cast(environ[name])
+        else:
+            config.setdefault(name, default)
+
+
+def is_sqlite_file(url):
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def engine_options(config):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for the configured database URI.
+
+    File-based SQLite gets a real connection pool sized by DATABASE_POOL_SIZE /
+    DATABASE_MAX_OVERFLOW / DATABASE_POOL_TIMEOUT (SQLAlchemy would otherwise open a
+    new connection for every checkout, losing the page cache and memory map each time).
+    In-memory SQLite keeps Flask-SQLAlchemy's single static connection. Other databases
+    get the same pool sizing, connections recycled after DATABASE_POOL_RECYCLE seconds and
+    checked with a ping before use, and on Postgres a DATABASE_STATEMENT_TIMEOUT.
+    """
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    url = config['SQLALCHEMY_DATABASE_URI']
+    if is_sqlite_file(url):
+        options.setdefault('poolclass', QueuePool)
+        # Pooled connections are handed between threads, one at a time
+        options.setdefault('connect_args', {}).setdefault('check_same_thread', False)
+    elif make_url(url).get_backend_name() == 'sqlite':
+        return options
+    else:
+        # Server connections can be dropped by the server or a proxy while idle in the pool
+        options.setdefault('pool_pre_ping', True)
+        if make_url(url).get_backend_name() == 'postgresql' and config['DATABASE_STATEMENT_TIMEOUT']:
+            options.setdefault('connect_args', {}).setdefault(
+                'options', f"-c statement_timeout={config['DATABASE_STATEMENT_TIMEOUT']}")
+
+    options.setdefault('pool_size', config['DATABASE_POOL_SIZE'])
+    options.setdefault('max_overflow', config['DATABASE_MAX_OVERFLOW'])
+    options.setdefault('pool_timeout', config['DATABASE_POOL_TIMEOUT'])
+    options.setdefault('pool_recycle', config['DATABASE_POOL_RECYCLE'])
+    return options
+
+
+def install_sqlite_pragmas(engine, pragmas):
+    """Runs `PRAGMA name = value` for every pragma on each new connection of a SQLite engine."""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
@@ -0,0 +1,162 @@
+import json
+import sqlite3
+import threading
+import time
+from urllib.parse import urlencode
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+# Response headers kept with a cached body; Link is needed to keep following pagination
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Link')
+
+
+class GitHubResponseCache:
+    """
+    Persistent cache of GitHub API responses with conditional requests.
+
+    Bodies are stored in SQLite together with their ETag / Last-Modified validators.
+    Later requests for the same URL send If-None-Match / If-Modified-Since and a
+    304 answer is served from the cache; GitHub does not count 304s against the rate
+    limit. Entries are kept per user and evicted least-recently-used once a user's
+    cached bodies exceed `max_bytes_per_user`.
+
+    Safe to use from several threads: the SQLite connection is shared behind a lock
+    that is never held during network requests.
+    """
+
+    def __init__(self, path, max_bytes_per_user=5 * 1024 * 1024):
+        self.max_bytes_per_user = max_bytes_per_user
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS github_response (
+                user_key TEXT NOT NULL,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (user_key, url)
+            )
+            """
+        )
+        self._connection.commit()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """
+        Hit/miss counters since start-up. Every hit is a 304 answered from the
+        cache, i.e. one request that did not cost rate limit or a body download.
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / total if total else 0.0,
+                'rate_limit_saved': self.hits,
+            }
+
+    def wrap(self, get, user_key):
+        """
+        Returns a drop-in replacement for `get(url, params=None, **kwargs)` that
+        revalidates against the cache of `user_key`.
+        """
+        user_key = str(user_key)
+
+        def cached_get(url, params=None, **kwargs):
+            key = f"{url}?{urlencode(sorted(params.items()))}" if params else url
+            entry = self._load(user_key, key)
+
+            headers = dict(kwargs.pop('headers', None) or {})
+            if entry:
+                if entry['etag']:
+                    headers['If-None-Match'] = entry['etag']
+                if entry['last_modified']:
+                    headers['If-Modified-Since'] = entry['last_modified']
+
+            response = get(url, params=params, headers=headers, **kwargs)
+
+            if response.status_code == 304 and entry:
+                with self._lock:
+                    self.hits += 1
+                return self._build_response(response, entry)
+
+            with self._lock:
+                self.misses += 1
+            if response.status_code == 200 and (response.headers.get('ETag') or response.headers.get('Last-Modified')):
+                self._store(user_key, key, response)
+            return response
+
+        return cached_get
+
+    def clear(self, user_key=None):
+        """Drops the cached responses of one user, or of everyone."""
+        with self._lock:
+            if user_key is None:
+                self._connection.execute("DELETE FROM github_response")
+            else:
+                self._connection.execute("DELETE FROM github_response WHERE user_key = ?", (str(user_key),))
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _load(self, user_key, key):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT etag, last_modified, headers, body FROM github_response WHERE user_key = ? AND url = ?",
+                (user_key, key),
+            ).fetchone()
+            if not row:
+                return None
+            self._connection.execute(
+                "UPDATE github_response SET last_used = ? WHERE user_key = ? AND url = ?",
+                (time.time(), user_key, key),
+            )
+            self._connection.commit()
+        etag, last_modified, headers, body = row
+        return {'etag': etag, 'last_modified': last_modified, 'headers': json.loads(headers), 'body': body}
+
+    def _store(self, user_key, key, response):
+        headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+        body = response.content
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO github_response VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (user_key, key, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                 json.dumps(headers), body, len(body), time.time()),
+            )
+            # Evict the least recently used entries beyond the user's size budget
+            evicted = self._connection.execute(
+                """
+                DELETE FROM github_response WHERE user_key = ? AND url IN (
+                    SELECT url FROM (
+                        SELECT url, SUM(size) OVER (ORDER BY last_used DESC, url) AS running_size
+                        FROM github_response WHERE user_key = ?
+                    ) WHERE running_size > ?
+                )
+                """,
+                (user_key, user_key, self.max_bytes_per_user),
+            ).rowcount
+            self.evictions += evicted
+            self._connection.commit()
+
+    @staticmethod
+    def _build_response(not_modified, entry):
+        response = Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response._content = entry['body']
+        response.encoding = 'utf-8'
+        response.url = not_modified.url
+        response.request = not_modified.request
+        return response
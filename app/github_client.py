@@ -0,0 +1,164 @@
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.assignments import is_rate_limited
+
+logger = logging.getLogger("GoGiTracker")
+
+# Answers worth retrying: GitHub's own errors and its proxies' timeouts
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# Kept from the answer that exhausted a token's rate limit, for the refusals that follow
+RATE_LIMIT_HEADERS = ('X-RateLimit-Limit', 'X-RateLimit-Remaining', 'X-RateLimit-Reset', 'X-RateLimit-Resource')
+
+
+class GitHubClientFactory:
+    """
+    Hands out GitHub API clients for single users' tokens. All of them share one
+    requests.Session, so connections (and their TLS sessions) to the API are kept
+    alive and reused across requests, threads and users; up to `pool_size` are open
+    at a time.
+
+    Clients retry connection errors and 5xx answers up to `max_retries` times with
+    exponential backoff and full jitter. A rate-limited answer carrying Retry-After is
+    retried after that delay if it is at most `max_wait` seconds; otherwise it is
+    returned for the caller to back off. While a token's X-RateLimit-Remaining is 0 for
+    a resource (REST, GraphQL, search), its requests to that resource are answered
+    locally with a rate-limit refusal until the reset.
+    """
+
+    def __init__(self, api_base_url='https://api.github.com/', pool_size=20, max_retries=3, backoff=0.5,
+                 max_wait=10):
+        self.api_base_url = api_base_url
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_wait = max_wait
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._rate_limits = {}  # (token, resource) -> (X-RateLimit-Reset, headers of the answer that exhausted it)
+        self._lock = threading.Lock()
+
+    def for_token(self, token):
+        return GitHubClient(self, token)
+
+    def close(self):
+        self.session.close()
+
+    def _exhausted(self, token, resource):
+        """
+        Headers of the answer that used up `token`'s limit for `resource` ('core',
+        'graphql', ...), while it is still exhausted.
+        """
+        with self._lock:
+            reset, headers = self._rate_limits.get((token, resource), (0, None))
+            if reset > time.time():
+                return headers
+            self._rate_limits.pop((token, resource), None)
+            return None
+
+    def _record_rate_limit(self, token, response):
+        remaining = response.headers.get('X-RateLimit-Remaining')
+        reset = response.headers.get('X-RateLimit-Reset', '')
+        if remaining == '0' and reset.isdigit():
+            resource = response.headers.get('X-RateLimit-Resource', 'core')
+            kept = {name: response.headers[name] for name in RATE_LIMIT_HEADERS if name in response.headers}
+            with self._lock:
+                self._rate_limits[token, resource] = (int(reset), kept)
+
+    def _delay(self, attempt):
+        """Full jitter: anywhere between 0 and the exponential backoff of this attempt."""
+        return random.uniform(0, min(self.max_wait, self.backoff * 2 ** attempt))
+
+
+class GitHubClient:
+    """
+    API client of one user: get(url, params=None, headers=None, timeout=None) returns a
+    requests.Response, like the OAuth client it replaces, and aget() is its coroutine
+    twin. post() sends JSON, e.g. GraphQL queries. `url` is relative to the API root or
+    absolute (pagination links).
+    """
+
+    def __init__(self, factory, token):
+        self.factory = factory
+        self.token = token
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        return self.request('GET', url, params=params, headers=headers, timeout=timeout)
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        """POSTs `json`. Only for requests that are safe to repeat, as failures are retried."""
+        return self.request('POST', url, json=json, headers=headers, timeout=timeout)
+
+    def request(self, method, url, headers=None, **kwargs):
+        factory = self.factory
+        url = urljoin(factory.api_base_url, url)
+        exhausted = factory._exhausted(self.token, rate_limit_resource(url))
+        if exhausted is not None:
+            return rate_limit_refusal(url, exhausted)
+
+        headers = {'Accept': 'application/vnd.github+json', **(headers or {}),
+                   'Authorization': f'Bearer {self.token}'}
+        attempt = 0
+        while True:
+            try:
+                response = factory.session.request(method, url, headers=headers, **kwargs)
+            except requests.ConnectionError as e:
+                if attempt >= factory.max_retries:
+                    raise
+                delay = factory._delay(attempt)
+                logger.warning("GitHub request %s failed (%s), retrying in %.1fs.", url, e, delay)
+            else:
+                factory._record_rate_limit(self.token, response)
+                delay = self._retry_delay(response, attempt)
+                if delay is None:
+                    return response
+                logger.warning("GitHub answered %s to %s, retrying in %.1fs.", response.status_code, url, delay)
+            time.sleep(delay)
+            attempt += 1
+
+    async def aget(self, url, params=None, headers=None, timeout=None):
+        """get() for coroutines: runs on a worker thread, on the same connection pool."""
+        return await asyncio.to_thread(self.get, url, params=params, headers=headers, timeout=timeout)
+
+    def _retry_delay(self, response, attempt):
+        """Seconds to wait before retrying `response`'s request, or None to return it."""
+        factory = self.factory
+        if attempt >= factory.max_retries:
+            return None
+        if response.status_code in RETRY_STATUSES:
+            return factory._delay(attempt)
+        if is_rate_limited(response):
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit() and int(retry_after) <= factory.max_wait:
+                return int(retry_after)
+        return None
+
+
+def rate_limit_resource(url):
+    """The rate limit GitHub counts a request to `url` against; GraphQL and search have their own."""
+    path = urlsplit(url).path
+    if path.endswith('/graphql'):
+        return 'graphql'
+    if '/search/' in path:
+        return 'search'
+    return 'core'
+
+
+def rate_limit_refusal(url, headers):
+    """A 403 like GitHub's own for an exhausted rate limit, answered without a request."""
+    response = requests.Response()
+    response.status_code = 403
+    response.url = url
+    response.headers.update(headers)
+    response._content = json.dumps({'message': "API rate limit exceeded (request not sent)"}).encode()
+    return response
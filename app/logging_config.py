@@ -0,0 +1,107 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, WatchedFileHandler
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Logging settings read from the environment when set there, else from config.py
+LOGGING_ENV_SETTINGS = ('LOG_LEVEL', 'LOG_FORMAT', 'LOG_FILE')
+
+# Attributes every LogRecord has; anything else was passed with `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, `extra=` fields and any traceback."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES)
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Enqueues records as they are. The stock QueueHandler formats every record on the
+    logging thread so it can be pickled to another process; the listener runs in this
+    process, so the %-formatting is left to its thread too.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def load_logging_config(config, environ=os.environ):
+    """LOG_LEVEL, LOG_FORMAT and LOG_FILE environment variables take precedence over config.py."""
+    for name in LOGGING_ENV_SETTINGS:
+        if environ.get(name):
+            config[name] = environ[name]
+
+
+def configure_logging(logger, level, console_level, log_format='text', log_file=None, max_bytes=10 * 1024 * 1024,
+                      backup_count=5):
+    """
+    Sends `logger` through a queue: the logging call only appends the record to an
+    in-memory queue, and a QueueListener thread formats it and writes it to the console
+    and to `log_file` (None for console only). Calling it again replaces the previous
+    pipeline, so each application built by create_app() gets its settings.
+
+    `log_file` is rotated at `max_bytes`, which is only safe while a single process writes
+    it: another process would keep writing to the renamed file, or rotate it again. With
+    `max_bytes=0` the file is left to an external tool such as logrotate and reopened
+    whenever it has been moved, so several processes (gunicorn workers) can share it.
+    """
+    global _listener
+    formatter = JSONFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT)
+
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(console_level)
+    handlers = [console_handler]
+    if log_file:
+        # The file is only opened once something is logged
+        if max_bytes:
+            handlers.append(RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                                encoding='utf-8', delay=True))
+        else:
+            handlers.append(WatchedFileHandler(log_file, encoding='utf-8', delay=True))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    with _listener_lock:
+        stop_logging()
+        for handler in list(logger.handlers):
+            if isinstance(handler, QueueHandler):
+                logger.removeHandler(handler)
+        log_queue = queue.SimpleQueue()
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        logger.addHandler(DeferredQueueHandler(log_queue))
+        logger.setLevel(level)
+
+
+def stop_logging():
+    """Writes out every queued record and stops the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_logging)
@@ -0,0 +1,184 @@
+import contextvars
+import threading
+import time
+
+from flask import request
+from sqlalchemy import event
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Timings of the request being handled on this thread, None outside requests
+_current_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Database queries and GitHub calls made while handling one request, with the time spent on them."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.github_calls = 0
+        self.github_time = 0.0
+        self._lock = threading.Lock()  # GitHub calls are made from README fetch threads
+
+    def add_query(self, seconds):
+        self.db_queries += 1
+        self.db_time += seconds
+
+    def add_github_call(self, seconds):
+        with self._lock:
+            self.github_calls += 1
+            self.github_time += seconds
+
+    def server_timing(self, duration):
+        """Server-Timing header value; browsers show it in the network panel of the developer tools."""
+        return (f'app;dur={duration * 1000:.1f}, '
+                f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries", '
+                f'github;dur={self.github_time * 1000:.1f};desc="{self.github_calls} calls"')
+
+
+class RequestMetrics:
+    """
+    Per-endpoint totals since start-up: requests by method and status, a latency histogram,
+    and the number of and time spent on database queries and GitHub calls. Rendered in the
+    Prometheus text exposition format by render().
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._requests = {}  # (endpoint, method, status) -> count
+        self._endpoints = {}  # endpoint -> totals
+
+    def observe(self, endpoint, method, status, duration, timings):
+        with self._lock:
+            key = (endpoint, method, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            totals = self._endpoints.setdefault(endpoint, {
+                'buckets': [0] * len(self.buckets), 'count': 0, 'duration': 0.0,
+                'db_queries': 0, 'db_time': 0.0, 'github_calls': 0, 'github_time': 0.0,
+            })
+            for i, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    totals['buckets'][i] += 1
+            totals['count'] += 1
+            totals['duration'] += duration
+            totals['db_queries'] += timings.db_queries
+            totals['db_time'] += timings.db_time
+            totals['github_calls'] += timings.github_calls
+            totals['github_time'] += timings.github_time
+
+    def render(self, extra=()):
+        """
+        The metrics as Prometheus text. `extra` adds (name, type, help, value) samples
+        without labels, e.g. the GitHub cache counters.
+        """
+        with self._lock:
+            requests = sorted(self._requests.items())
+            endpoints = sorted((endpoint, dict(totals, buckets=list(totals['buckets'])))
+                               for endpoint, totals in self._endpoints.items())
+
+        lines = ['# HELP gogitracker_requests_total Requests handled, by endpoint, method and status.',
+                 '# TYPE gogitracker_requests_total counter']
+        for (endpoint, method, status), count in requests:
+            lines.append(f'gogitracker_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} '
+                         f'{count}')
+
+        lines += ['# HELP gogitracker_request_duration_seconds Time to build the response, by endpoint.',
+                  '# TYPE gogitracker_request_duration_seconds histogram']
+        for endpoint, totals in endpoints:
+            for bound, count in zip(self.buckets, totals['buckets']):
+                lines.append(f'gogitracker_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} '
+                             f'{count}')
+            lines.append(f'gogitracker_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} '
+                         f'{totals["count"]}')
+            lines.append(f'gogitracker_request_duration_seconds_sum{{endpoint="{endpoint}"}} {totals["duration"]:.6f}')
+            lines.append(f'gogitracker_request_duration_seconds_count{{endpoint="{endpoint}"}} {totals["count"]}')
+
+        for name, key, description in (
+            ('db_queries_total', 'db_queries', 'Database queries run while handling requests.'),
+            ('db_duration_seconds_total', 'db_time', 'Time spent in database queries.'),
+            ('github_requests_total', 'github_calls', 'GitHub API calls made while handling requests.'),
+            ('github_duration_seconds_total', 'github_time', 'Time spent waiting for the GitHub API.'),
+        ):
+            lines += [f'# HELP gogitracker_{name} {description}', f'# TYPE gogitracker_{name} counter']
+            for endpoint, totals in endpoints:
+                value = totals[key]
+                if isinstance(value, float):
+                    value = f'{value:.6f}'
+                lines.append(f'gogitracker_{name}{{endpoint="{endpoint}"}} {value}')
+
+        for name, kind, description, value in extra:
+            lines += [f'# HELP gogitracker_{name} {description}', f'# TYPE gogitracker_{name} {kind}',
+                      f'gogitracker_{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+
+def current_timings():
+    """The RequestTimings of the request being handled, or None outside a request."""
+    return _current_timings.get()
+
+
+def timed_github_get(get):
+    """
+    Wraps a GitHub `get(url, **kwargs)` so its calls count towards the current request.
+    The request is looked up when wrapping, so the wrapper can be called from other threads.
+    """
+    timings = current_timings()
+    if timings is None:
+        return get
+
+    def timed_get(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return get(*args, **kwargs)
+        finally:
+            timings.add_github_call(time.perf_counter() - started)
+
+    return timed_get
+
+
+def instrument_engine(engine):
+    """Counts and times every statement an engine runs towards the current request."""
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.add_query(time.perf_counter() - context._query_started)
+
+
+def init_request_metrics(app):
+    """
+    Times every request of `app`: the totals go to app.extensions['request_metrics'] and
+    each response gets a Server-Timing header with its own wall, DB and GitHub time.
+    """
+    metrics = app.extensions['request_metrics'] = RequestMetrics()
+
+    @app.before_request
+    def start_request_timer():
+        _current_timings.set(RequestTimings())
+
+    @app.after_request
+    def record_request_timings(response):
+        timings = _current_timings.get()
+        if timings is None:
+            return response
+        duration = time.perf_counter() - timings.started
+        # Endpoints are labelled without their blueprint: `index`, `tasks`, `github_assignments`...
+        endpoint = request.endpoint.rpartition('.')[2] if request.endpoint else 'unmatched'
+        metrics.observe(endpoint, request.method, response.status_code, duration, timings)
+        response.headers['Server-Timing'] = timings.server_timing(duration)
+        return response
+
+    @app.teardown_request
+    def clear_request_timings(exception=None):
+        _current_timings.set(None)
+
+    return metrics
@@ -0,0 +1,115 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+logger = logging.getLogger("GoGiTracker")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when more hashes are pending than the hasher accepts."""
+
+
+class PasswordHasher:
+    """
+    Hashes and checks passwords on a dedicated pool of `max_workers` threads, so a burst
+    of logins occupies at most that many cores (hashlib releases the GIL while hashing)
+    and request threads stay free for other pages. At most `max_pending` hashes wait
+    for a thread; beyond that, hash() and check() raise PasswordHasherBusy instead of
+    queueing without bound.
+
+    `method` is werkzeug's hash method with its cost, e.g. "scrypt:32768:8:1" or
+    "pbkdf2:sha256:600000". Hashes made with other parameters still verify, and
+    needs_rehash() tells which ones to replace.
+    """
+
+    def __init__(self, method='scrypt', max_workers=2, max_pending=32):
+        self.method = method
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._prefix = None  # `method` with all of its parameters, as written into hashes
+
+    def _run(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Too many password hashes pending.")
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password):
+        password_hash = self._run(generate_password_hash, password, self.method)
+        self._prefix = password_hash.split('$', 1)[0]
+        return password_hash
+
+    def check(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Whether `password_hash` was made with another method or cost than the configured one."""
+        if self._prefix is None:
+            self.hash('')  # Learns the parameters werkzeug fills in for `method`
+        return password_hash.split('$', 1)[0] != self._prefix
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class LoginThrottle:
+    """
+    Counts failed logins per key (a username, a client address) over a sliding window of
+    `window` seconds. A key with `max_failures` failures in the window is throttled until
+    the oldest of them expires; callers reject its attempts before checking a password.
+    At most `max_keys` keys are tracked, the least recently failed are dropped first.
+    """
+
+    def __init__(self, max_failures, window, max_keys=10000):
+        self.max_failures = max_failures
+        self.window = window
+        self.max_keys = max_keys
+        self._failures = OrderedDict()  # key -> deque of failure times
+        self._lock = threading.Lock()
+
+    def _recent(self, key, now):
+        failures = self._failures.get(key)
+        if failures is None:
+            return None
+        while failures and failures[0] <= now - self.window:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+            return None
+        return failures
+
+    def retry_after(self, key):
+        """Seconds until `key` may try again, or 0 if it is not throttled."""
+        now = time.monotonic()
+        with self._lock:
+            failures = self._recent(key, now)
+            if failures is None or len(failures) < self.max_failures:
+                return 0
+            return max(1, int(failures[0] + self.window - now + 1))
+
+    def fail(self, key):
+        now = time.monotonic()
+        with self._lock:
+            failures = self._recent(key, now) or deque(maxlen=self.max_failures)
+            failures.append(now)
+            self._failures[key] = failures
+            self._failures.move_to_end(key)
+            while len(self._failures) > self.max_keys:
+                self._failures.popitem(last=False)
+
+    def reset(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._failures.clear()
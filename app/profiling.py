@@ -0,0 +1,106 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import time
+from datetime import datetime
+
+from flask import g, request
+
+logger = logging.getLogger("GoGiTracker")
+
+PROFILE_SUFFIX = '.prof'
+_UNSAFE_CHARACTERS = re.compile(r'[^A-Za-z0-9_-]+')
+
+
+class ProfileStore:
+    """
+    Bounded on-disk ring of cProfile dumps: once more than `max_files` are stored, the
+    oldest are deleted. Dumps open in snakeviz, or flameprof for a flame graph.
+    """
+
+    def __init__(self, directory, max_files=50):
+        self.directory = directory
+        self.max_files = max_files
+
+    def save(self, profile, endpoint, username, duration):
+        """Dumps `profile` under a name recording when, where and for whom; returns the file name."""
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        parts = [stamp, endpoint or 'unmatched', username or 'anonymous', f'{duration * 1000:.0f}ms']
+        name = '_'.join(_UNSAFE_CHARACTERS.sub('-', part) for part in parts) + PROFILE_SUFFIX
+        profile.dump_stats(os.path.join(self.directory, name))
+        for old in self.list()[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.directory, old['name']))
+            except FileNotFoundError:
+                pass  # Removed by another worker
+        return name
+
+    def list(self):
+        """Stored profiles, newest first, as {'name', 'size', 'created'} dicts."""
+        try:
+            entries = [entry for entry in os.scandir(self.directory)
+                       if entry.is_file() and entry.name.endswith(PROFILE_SUFFIX)]
+        except FileNotFoundError:
+            return []
+        entries.sort(key=lambda entry: entry.name, reverse=True)  # Names start with the timestamp
+        return [{'name': entry.name, 'size': entry.stat().st_size,
+                 'created': datetime.fromtimestamp(entry.stat().st_mtime)} for entry in entries]
+
+    def path(self, name):
+        """Absolute path of a stored profile, or None for names that are not one of ours."""
+        if os.path.basename(name) != name or not name.endswith(PROFILE_SUFFIX):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+    def summary(self, name, limit=40):
+        """The `limit` most expensive functions of a profile by cumulative time, as pstats text."""
+        output = io.StringIO()
+        stats = pstats.Stats(self.path(name), stream=output)
+        stats.sort_stats('cumulative').print_stats(limit)
+        return output.getvalue()
+
+
+def init_profiler(app, store, current_username, admins, sample_rate=0.0):
+    """
+    Runs selected requests of `app` under cProfile and saves them to `store`: requests with
+    `?profile=1` from a user whose `current_username()` is in `admins`, and a random
+    `sample_rate` fraction of all requests. Only the request thread is profiled. Not
+    calling this at all leaves the app without any profiling hooks.
+    """
+
+    @app.before_request
+    def start_profile():
+        if not (random.random() < sample_rate or (request.args.get('profile') == '1' and current_username() in admins)):
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:  # Another profiler is already active on this thread
+            logger.warning("Request not profiled: %s", e)
+            return
+        g.profile = (profile, time.perf_counter())
+
+    @app.after_request
+    def save_profile(response):
+        if 'profile' not in g:
+            return response
+        profile, started = g.pop('profile')
+        profile.disable()
+        duration = time.perf_counter() - started
+        endpoint = request.endpoint.rpartition('.')[2] if request.endpoint else None
+        name = store.save(profile, endpoint, current_username(), duration)
+        response.headers['X-Profile'] = name
+        logger.info("Saved profile %s.", name)
+        return response
+
+    @app.teardown_request
+    def discard_profile(exception=None):
+        # after_request is skipped when building the response itself failed
+        if 'profile' in g:
+            g.pop('profile')[0].disable()
@@ -0,0 +1,190 @@
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask.sessions import SessionInterface, SessionMixin, session_json_serializer
+from werkzeug.datastructures import CallbackDict
+
+from app.caching import LRUCache
+
+# Longest session id accepted from a cookie; ours are 43 characters
+MAX_SESSION_ID_LENGTH = 64
+
+
+class MemorySessionBackend:
+    """Sessions of this process only, the `max_entries` most recently saved ones."""
+
+    def __init__(self, max_entries=10000):
+        self._entries = LRUCache(max_entries)
+
+    def load(self, sid):
+        entry = self._entries.get(sid)
+        if entry is None:
+            return None
+        expires, data = entry
+        if expires <= time.time():
+            self._entries.delete(sid)
+            return None
+        return data
+
+    def save(self, sid, data, ttl):
+        self._entries.set(sid, (time.time() + ttl, data))
+
+    def delete(self, sid):
+        self._entries.delete(sid)
+
+
+class SQLiteSessionBackend:
+    """
+    Sessions in a SQLite file, shared by every process on the host. Expired sessions
+    are purged every `purge_every` saves.
+    """
+
+    def __init__(self, path, purge_every=1000):
+        self.purge_every = purge_every
+        self._saves = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS session (sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def load(self, sid):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data FROM session WHERE sid = ? AND expires > ?", (sid, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def save(self, sid, data, ttl):
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO session (sid, data, expires) VALUES (?, ?, ?)", (sid, data, now + ttl)
+            )
+            self._saves += 1
+            if self._saves % self.purge_every == 0:
+                self._connection.execute("DELETE FROM session WHERE expires <= ?", (now,))
+            self._connection.commit()
+
+    def delete(self, sid):
+        with self._lock:
+            self._connection.execute("DELETE FROM session WHERE sid = ?", (sid,))
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class RedisSessionBackend:
+    """
+    Sessions in Redis (or anything speaking its get / set(ex=) / delete commands),
+    which expires them itself. `client` is e.g. redis.Redis.from_url(...).
+    """
+
+    def __init__(self, client, prefix='gogitracker:session:'):
+        self.client = client
+        self.prefix = prefix
+
+    def load(self, sid):
+        data = self.client.get(self.prefix + sid)
+        return data.decode() if isinstance(data, bytes) else data
+
+    def save(self, sid, data, ttl):
+        self.client.set(self.prefix + sid, data, ex=max(1, int(ttl)))
+
+    def delete(self, sid):
+        self.client.delete(self.prefix + sid)
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Session data kept by a backend; the cookie only carries the random `sid`."""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(session):
+            session.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid or secrets.token_urlsafe(32)
+        self.new = new
+        self.modified = False
+        self.replaced_sid = None
+
+    def regenerate(self):
+        """
+        Moves the data to a new id, e.g. at login, so an id that was known before
+        (planted or leaked) does not reach the authenticated session.
+        """
+        if not self.new and self.replaced_sid is None:
+            self.replaced_sid = self.sid
+        self.sid = secrets.token_urlsafe(32)
+        self.modified = True
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface storing sessions in `backend` for the app's session lifetime."""
+
+    serializer = session_json_serializer
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid and len(sid) <= MAX_SESSION_ID_LENGTH:
+            data = self.backend.load(sid)
+            if data is not None:
+                return ServerSideSession(self.serializer.loads(data), sid)
+        return ServerSideSession(new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if session.replaced_sid:
+            self.backend.delete(session.replaced_sid)
+
+        if not session:
+            if session.modified:  # Emptied, e.g. at logout
+                if not session.new:
+                    self.backend.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path, secure=self.get_cookie_secure(app),
+                                       samesite=self.get_cookie_samesite(app), httponly=self.get_cookie_httponly(app))
+            return
+
+        response.vary.add('Cookie')
+        if not self.should_set_cookie(app, session):
+            return
+        ttl = app.permanent_session_lifetime.total_seconds()
+        self.backend.save(session.sid, self.serializer.dumps(dict(session)), ttl)
+        response.set_cookie(name, session.sid, expires=self.get_expiration_time(app, session),
+                            httponly=self.get_cookie_httponly(app), domain=domain, path=path,
+                            secure=self.get_cookie_secure(app), samesite=self.get_cookie_samesite(app))
+
+
+def session_backend_from_config(config):
+    """
+    The session backend selected by SESSION_BACKEND ('memory', 'sqlite' or 'redis'),
+    or None for 'cookie', Flask's signed cookie sessions.
+    """
+    backend = config['SESSION_BACKEND']
+    if backend == 'cookie':
+        return None
+    if backend == 'memory':
+        return MemorySessionBackend(config['SESSION_MAX_ENTRIES'])
+    if backend == 'sqlite':
+        return SQLiteSessionBackend(config['SESSION_SQLITE_PATH'])
+    if backend == 'redis':
+        client = config['SESSION_REDIS']
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("SESSION_BACKEND = 'redis' needs the redis package (pip install redis).")
+            client = redis.Redis.from_url(config['SESSION_REDIS_URL'])
+        return RedisSessionBackend(client)
+    raise ValueError(f"Unknown SESSION_BACKEND {backend!r}; use 'memory', 'sqlite', 'redis' or 'cookie'.")
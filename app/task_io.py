@@ -0,0 +1,228 @@
+import codecs
+import csv
+import io
+from datetime import datetime, timedelta
+
+TASK_STATUSES = ("In Progress", "Done")
+
+CSV_COLUMNS = ('id', 'date', 'task_text', 'status')
+
+# iCalendar VTODO status for each task status
+ICS_STATUSES = {'In Progress': 'NEEDS-ACTION', 'Done': 'COMPLETED'}
+
+
+class TaskFileError(ValueError):
+    """An import file that cannot be read past `line`: a bad header, encoding or CSV syntax."""
+
+    def __init__(self, message, line):
+        super().__init__(message)
+        self.line = line
+
+
+def iter_csv(rows, chunk_rows=500):
+    """
+    Yields a CSV document of (id, date, task_text, status) rows in chunks of
+    `chunk_rows` rows, so arbitrarily many rows can be streamed in constant memory.
+    The header comes first on its own, before any row has been read.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    for count, (task_id, task_date, task_text, status) in enumerate(rows, 1):
+        writer.writerow((task_id, task_date.isoformat(), task_text, status))
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def parse_task_date(value, field='date'):
+    """Parses a YYYY-MM-DD date, raising ValueError with a client-facing message."""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ValueError(f"'{field}' must be a date in YYYY-MM-DD format.")
+
+
+def validate_task_text(value):
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError("'task_text' cannot be empty.")
+    if len(value) > 255:
+        raise ValueError("'task_text' must be at most 255 characters long.")
+    return value
+
+
+def validate_task_status(value):
+    if value not in TASK_STATUSES:
+        raise ValueError(f"'status' must be one of: {', '.join(TASK_STATUSES)}.")
+    return value
+
+
+def validate_task_record(record):
+    """
+    Validates an imported {'date', 'task_text', 'status'} record of strings and returns
+    the values to insert. Raises ValueError describing the first problem found.
+    """
+    return {
+        'date': parse_task_date(record.get('date')),
+        'task_text': validate_task_text(record.get('task_text')),
+        'status': validate_task_status(record.get('status') or "In Progress"),
+    }
+
+
+def decode_lines(lines, encoding='utf-8-sig'):
+    """
+    Decodes an iterable of byte lines (e.g. a binary file) one line at a time, so an
+    undecodable byte raises UnicodeDecodeError at its own line rather than wherever a
+    buffered decoder happens to read ahead to.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for line in lines:
+        yield decoder.decode(line)
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def read_csv_records(lines):
+    """
+    Yields (line_number, record) for every row of a CSV document with a header row
+    containing at least `date` and `task_text` (`status` is optional, other columns
+    such as the exported `id` are ignored). `lines` is read lazily, one row at a time.
+    Raises TaskFileError when the file cannot be read any further.
+    """
+    reader = csv.DictReader(lines)
+    try:
+        missing = {'date', 'task_text'} - set(reader.fieldnames or ())
+        if missing:
+            raise TaskFileError(f"CSV header is missing the column(s): {', '.join(sorted(missing))}.", 1)
+        for record in reader:
+            yield reader.line_num, record
+    except UnicodeDecodeError as e:
+        # The line after the last one read could not be decoded
+        raise TaskFileError(str(e), reader.line_num + 1)
+    except csv.Error as e:
+        raise TaskFileError(str(e), reader.line_num)
+
+
+def unescape_ics_text(value):
+    result = []
+    characters = iter(value)
+    for character in characters:
+        if character == '\\':
+            escaped = next(characters, '')
+            result.append('\n' if escaped in ('n', 'N') else escaped)
+        else:
+            result.append(character)
+    return ''.join(result)
+
+
+def _ics_date(value):
+    # DATE (20240201) or DATE-TIME (20240201T090000Z) values: only the date is kept.
+    # Anything else is passed on unchanged and rejected by validate_task_record().
+    try:
+        return datetime.strptime(value[:8], '%Y%m%d').date().isoformat()
+    except (TypeError, ValueError):
+        return value
+
+
+def read_ics_records(lines):
+    """
+    Yields (line_number, record) for every VTODO or VEVENT of an iCalendar document,
+    reading `lines` lazily. The task date is taken from DTSTART, or from DUE when a
+    to-do has no start; COMPLETED to-dos are imported as done. Raises TaskFileError
+    when the file cannot be read any further.
+    """
+    component = None
+    properties = {}
+    start_line = 0
+    lines_read = 0
+    pending = None  # (line_number, text) of the logical line being unfolded
+
+    def logical_lines():
+        nonlocal pending, lines_read
+        for line in lines:
+            lines_read += 1
+            line = line.rstrip('\r\n')
+            if line[:1] in (' ', '\t') and pending:
+                pending = (pending[0], pending[1] + line[1:])
+                continue
+            if pending:
+                yield pending
+            pending = (lines_read, line)
+        if pending:
+            yield pending
+
+    try:
+        for line_number, line in logical_lines():
+            name_and_params, _, value = line.partition(':')
+            name = name_and_params.partition(';')[0].upper()
+            if name == 'BEGIN' and value.upper() in ('VTODO', 'VEVENT'):
+                component, properties, start_line = value.upper(), {}, line_number
+            elif name == 'END' and component and value.upper() == component:
+                component = None
+                yield start_line, {
+                    'date': _ics_date(properties.get('DTSTART') or properties.get('DUE')),
+                    'task_text': unescape_ics_text(properties.get('SUMMARY', '')),
+                    'status': "Done" if properties.get('STATUS', '').upper() == 'COMPLETED' else "In Progress",
+                }
+            elif component:
+                properties.setdefault(name, value)
+    except UnicodeDecodeError as e:
+        # The line after the last one read could not be decoded
+        raise TaskFileError(str(e), lines_read + 1)
+
+
+def escape_ics_text(value):
+    """Escapes a TEXT value as required by RFC 5545."""
+    return (value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def fold_ics_line(line):
+    """Folds a content line to at most 75 octets per physical line, as required by RFC 5545."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Never split a multi-byte UTF-8 character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+        limit = 74  # Continuation lines start with a space
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def iter_ics(rows, hostname='gogitracker', chunk_rows=200):
+    """
+    Yields an iCalendar document with one all-day VTODO per (id, date, task_text, status)
+    row, in chunks of `chunk_rows` tasks. The calendar header comes first on its own,
+    before any row has been read.
+    """
+    stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+    yield 'BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//GoGiTracker//Tasks//EN\r\n'
+    chunk = []
+    for count, (task_id, task_date, task_text, status) in enumerate(rows, 1):
+        chunk += [
+            'BEGIN:VTODO\r\n',
+            f'UID:task-{task_id}@{hostname}\r\n',
+            f'DTSTAMP:{stamp}\r\n',
+            f'DTSTART;VALUE=DATE:{task_date:%Y%m%d}\r\n',
+            f'DUE;VALUE=DATE:{task_date + timedelta(days=1):%Y%m%d}\r\n',
+            fold_ics_line(f'SUMMARY:{escape_ics_text(task_text)}'),
+            f'STATUS:{ICS_STATUSES.get(status, "NEEDS-ACTION")}\r\n',
+            'END:VTODO\r\n',
+        ]
+        if count % chunk_rows == 0:
+            yield ''.join(chunk)
+            chunk = []
+    chunk.append('END:VCALENDAR\r\n')
+    yield ''.join(chunk)
@@ -0,0 +1,139 @@
+import hashlib
+import hmac
+import logging
+import queue
+import threading
+from datetime import datetime, timezone
+
+logger = logging.getLogger("GoGiTracker")
+
+# Events the webhook acts on; anything else is acknowledged and dropped
+HANDLED_EVENTS = ('push', 'repository')
+
+
+class WebhookQueueFull(Exception):
+    """Raised when more repository changes are waiting than the worker accepts."""
+
+
+def sign_payload(secret, body):
+    """The X-Hub-Signature-256 header GitHub sends with `body` for a webhook with `secret`."""
+    if isinstance(secret, str):
+        secret = secret.encode()
+    return 'sha256=' + hmac.new(secret, body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(secret, body, signature):
+    """Whether `signature` (X-Hub-Signature-256) was made from `body` with `secret`, in constant time."""
+    if not secret or not signature:
+        return False
+    # As bytes: compare_digest refuses str with non-ASCII characters, which any client can send
+    return hmac.compare_digest(sign_payload(secret, body).encode(), signature.encode('latin-1', 'replace'))
+
+
+def github_timestamp(value):
+    """
+    GitHub's pushed_at as the REST API writes it ("2024-02-01T10:00:00Z"). Push events
+    carry it as a Unix timestamp, so it is converted to match what syncs store.
+    """
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    return value
+
+
+def touches_readme(payload):
+    """
+    Whether a push may have changed README.md. Forced pushes and pushes whose commits are
+    not all listed (GitHub caps the list) are assumed to.
+    """
+    commits = payload.get('commits') or []
+    if payload.get('forced') or not commits or len(commits) < payload.get('size', len(commits)):
+        return True
+    return any('README.md' in commit.get(change, ()) for commit in commits
+               for change in ('added', 'modified', 'removed'))
+
+
+def repository_change(event, payload):
+    """
+    What a webhook delivery changes about one repository, or None if nothing the
+    assignment lists show. The change is a dict with the repository's 'url', 'owner',
+    'name' and 'pushed_at' and an 'action':
+
+    - 'pushed': the default branch moved; 'readme_changed' tells whether README.md may differ.
+    - 'moved': renamed or transferred from 'old_url'.
+    - 'deleted': the repository is gone.
+    """
+    repository = payload.get('repository') or {}
+    url = repository.get('html_url')
+    owner = (repository.get('owner') or {}).get('login')
+    if not url or not owner or not repository.get('name'):
+        return None
+    change = {'url': url, 'owner': owner, 'name': repository['name'],
+              'pushed_at': github_timestamp(repository.get('pushed_at'))}
+
+    if event == 'push':
+        # Classroom READMEs are read from the default branch; tags and other branches do not count
+        if payload.get('deleted') or payload.get('ref') != f"refs/heads/{repository.get('default_branch')}":
+            return None
+        return {**change, 'action': 'pushed', 'readme_changed': touches_readme(payload)}
+
+    if event == 'repository':
+        action = payload.get('action')
+        changes = payload.get('changes') or {}
+        if action == 'deleted':
+            return {**change, 'action': 'deleted'}
+        if action == 'renamed':
+            old_name = changes.get('repository', {}).get('name', {}).get('from')
+            if old_name:
+                return {**change, 'action': 'moved', 'old_url': f"{url.rsplit('/', 1)[0]}/{old_name}"}
+        if action == 'transferred':
+            old_owner = changes.get('owner', {}).get('from', {})
+            old_login = (old_owner.get('user') or old_owner.get('organization') or {}).get('login')
+            if old_login:
+                return {**change, 'action': 'moved',
+                        'old_url': f"{url.rsplit('/', 2)[0]}/{old_login}/{repository['name']}"}
+    return None
+
+
+class WebhookWorker:
+    """
+    Background thread applying repository changes received by the webhook, so deliveries
+    are answered as soon as they are queued. `apply(change)` runs inside an application
+    context of `app`; the thread starts with the first submitted change. At most
+    `max_pending` changes wait, beyond that submit() raises WebhookQueueFull.
+    """
+
+    def __init__(self, app, apply, max_pending=1000):
+        self.app = app
+        self.apply = apply
+        self._changes = queue.Queue(max_pending)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, change):
+        try:
+            self._changes.put_nowait(change)
+        except queue.Full:
+            raise WebhookQueueFull("Too many repository changes pending.")
+        with self._lock:
+            if not self.running:
+                self._thread = threading.Thread(target=self._run, name="github-webhooks", daemon=True)
+                self._thread.start()
+
+    def join(self):
+        """Waits until every submitted change has been applied."""
+        self._changes.join()
+
+    def _run(self):
+        while True:
+            change = self._changes.get()
+            try:
+                with self.app.app_context():
+                    self.apply(change)
+            except Exception as e:
+                logger.error("Applying GitHub webhook change to %s failed: %s", change['url'], e)
+            finally:
+                self._changes.task_done()
@@ -0,0 +1,7 @@
+"""
+WSGI entry point: `flask --app app/wsgi.py run` or `gunicorn app.wsgi:app`.
+Run `flask --app app/wsgi.py init-db` once before serving a new database.
+"""
+from app.server import create_app
+
+app = create_app()
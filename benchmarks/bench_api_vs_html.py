@@ -0,0 +1,69 @@
+"""
+Requests/sec of the JSON task API against the HTML routes, in-process through
+the Flask test client (no network), for reading a day and completing a task.
+
+Uses a throwaway benchmark user in the configured database and removes it afterwards.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_api_vs_html.py [requests]
+"""
+import logging
+import sys
+import time
+import uuid
+from datetime import date
+
+from app.wsgi import app
+from app.server import db, User, Task
+
+DAY = date(2024, 2, 1)
+TASKS_PER_DAY = 20
+
+
+def rate(label, requests, send):
+    started = time.perf_counter()
+    for i in range(requests):
+        response = send(i)
+        assert response.status_code < 400, response.status_code
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<50} {requests / elapsed:9.1f} req/s")
+
+
+def main(requests):
+    logging.getLogger("GoGiTracker").setLevel(logging.WARNING)
+    username = f"bench-{uuid.uuid4().hex[:8]}"
+    client = app.test_client()
+    client.post("/signup", data={"username": username, "password": "benchpassword"})
+    client.post("/login", data={"username": username, "password": "benchpassword"})
+
+    with app.app_context():
+        user = User.query.filter_by(username=username).one()
+        user_id = user.id
+        db.session.add_all([
+            Task(user_id=user_id, date=DAY, task_text=f"Seed task {i}") for i in range(TASKS_PER_DAY)
+        ])
+        db.session.commit()
+
+    day_url = f"/tasks/{DAY.year}/{DAY.month}/{DAY.day}"
+    try:
+        print(f"Reading a day with {TASKS_PER_DAY} tasks ({requests} requests)")
+        rate("HTML  GET " + day_url, requests, lambda i: client.get(day_url))
+        rate(f"JSON  GET /api/tasks?from={DAY}&to={DAY}", requests,
+             lambda i: client.get(f"/api/tasks?from={DAY}&to={DAY}"))
+
+        with app.app_context():
+            ids = [task.id for task in Task.query.filter_by(user_id=user_id)]
+        print(f"Completing a task ({requests} requests)")
+        rate("HTML  POST " + day_url + " + redirect", requests,
+             lambda i: client.post(day_url, data={"task_id": ids[i % len(ids)]}, follow_redirects=True))
+        rate("JSON  PATCH /api/tasks/<id>", requests,
+             lambda i: client.patch(f"/api/tasks/{ids[i % len(ids)]}", json={"status": "Done"}))
+    finally:
+        with app.app_context():
+            Task.query.filter_by(user_id=user_id).delete()
+            User.query.filter_by(id=user_id).delete()
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
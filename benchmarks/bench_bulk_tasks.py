@@ -0,0 +1,61 @@
+"""
+Tasks/sec of closing out a sprint: marking tasks done one request at a time
+through /mark_finished against a single bulk API request, and creating them one
+by one through the JSON API against /api/tasks/batch.
+
+Uses a throwaway benchmark user in the configured database and removes it afterwards.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_bulk_tasks.py [tasks]
+"""
+import logging
+import sys
+import time
+import uuid
+
+from app.wsgi import app
+from app.server import db, User, Task
+
+
+def report(label, tasks, elapsed):
+    print(f"  {label:<40} {tasks / elapsed:10.1f} tasks/s  ({elapsed * 1000:.1f} ms)")
+
+
+def main(count):
+    logging.getLogger("GoGiTracker").setLevel(logging.WARNING)
+    username = f"bench-{uuid.uuid4().hex[:8]}"
+    client = app.test_client()
+    client.post("/signup", data={"username": username, "password": "benchpassword"})
+    client.post("/login", data={"username": username, "password": "benchpassword"})
+    payload = [{"date": "2024-02-01", "task_text": f"Sprint task {i}"} for i in range(count)]
+
+    try:
+        print(f"Creating {count} tasks")
+        started = time.perf_counter()
+        single_ids = [client.post("/api/tasks", json=task).get_json()["id"] for task in payload]
+        report("POST /api/tasks per task", count, time.perf_counter() - started)
+
+        started = time.perf_counter()
+        response = client.post("/api/tasks/batch", json={"tasks": payload})
+        bulk_ids = [task["id"] for task in response.get_json()["tasks"]]
+        report("POST /api/tasks/batch", count, time.perf_counter() - started)
+
+        print(f"Completing {count} tasks")
+        started = time.perf_counter()
+        for task_id in single_ids:
+            client.post("/mark_finished", data={"task_id": task_id})
+        report("POST /mark_finished per task", count, time.perf_counter() - started)
+
+        started = time.perf_counter()
+        client.post("/api/tasks/bulk", json={"action": "complete", "ids": bulk_ids})
+        report("POST /api/tasks/bulk complete", count, time.perf_counter() - started)
+    finally:
+        with app.app_context():
+            user = User.query.filter_by(username=username).one()
+            Task.query.filter_by(user_id=user.id).delete()
+            db.session.delete(user)
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
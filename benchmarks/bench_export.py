@@ -0,0 +1,69 @@
+"""
+Time to first byte, total time and peak Python memory of the streaming
+CSV/ICS task exports for a user with many tasks.
+
+Uses a throwaway benchmark user in the configured database and removes it afterwards.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_export.py [tasks]
+"""
+import logging
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import date, timedelta
+
+from app.wsgi import app
+from app.server import db, User, Task
+
+
+def measure(client, url):
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = client.get(url, buffered=False)
+    first_byte = None
+    size = 0
+    for chunk in response.response:
+        if first_byte is None:
+            first_byte = time.perf_counter() - started
+        size += len(chunk)
+    total = time.perf_counter() - started
+    response.close()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {url:<12} first byte {first_byte * 1000:8.1f} ms   total {total:6.2f} s   "
+          f"{size / 1e6:7.1f} MB sent   peak memory {peak / 1e6:6.1f} MB")
+
+
+def main(count):
+    logging.getLogger("GoGiTracker").setLevel(logging.WARNING)
+    username = f"bench-{uuid.uuid4().hex[:8]}"
+    client = app.test_client()
+    client.post("/signup", data={"username": username, "password": "benchpassword"})
+    client.post("/login", data={"username": username, "password": "benchpassword"})
+
+    with app.app_context():
+        user_id = User.query.filter_by(username=username).one().id
+        start = date(2000, 1, 1)
+        for offset in range(0, count, 50000):
+            db.session.execute(Task.__table__.insert(), [
+                {"user_id": user_id, "date": start + timedelta(days=i % 9000), "task_text": f"Exported task {i}",
+                 "status": "Done"}
+                for i in range(offset, min(offset + 50000, count))
+            ])
+        db.session.commit()
+
+    try:
+        print(f"Exporting {count:,} tasks")
+        measure(client, "/export.csv")
+        measure(client, "/export.ics")
+    finally:
+        with app.app_context():
+            Task.query.filter_by(user_id=user_id).delete()
+            User.query.filter_by(id=user_id).delete()
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
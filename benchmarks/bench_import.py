@@ -0,0 +1,59 @@
+"""
+Rows/sec of the chunked task import against the per-row path used by the
+HTML routes (one Task(...) + commit() per task).
+
+Uses a throwaway benchmark user in the configured database and removes it afterwards.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_import.py [rows]
+"""
+import io
+import logging
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+
+from app.wsgi import app
+from app.server import db, User, Task
+
+
+def report(label, rows, elapsed):
+    print(f"  {label:<40} {rows / elapsed:10.1f} rows/s  ({elapsed:.2f} s)")
+
+
+def main(rows):
+    logging.getLogger("GoGiTracker").setLevel(logging.WARNING)
+    username = f"bench-{uuid.uuid4().hex[:8]}"
+    client = app.test_client()
+    client.post("/signup", data={"username": username, "password": "benchpassword"})
+    client.post("/login", data={"username": username, "password": "benchpassword"})
+    start = date(2024, 1, 1)
+    records = [(start + timedelta(days=i % 365), f"Imported task {i}") for i in range(rows)]
+    csv_file = "date,task_text\n" + "".join(f"{day},{text}\n" for day, text in records)
+
+    with app.app_context():
+        user_id = User.query.filter_by(username=username).one().id
+    try:
+        print(f"Importing {rows:,} tasks")
+        per_row = records[:min(rows, 2000)]
+        with app.app_context():
+            started = time.perf_counter()
+            for day, text in per_row:
+                db.session.add(Task(user_id=user_id, date=day, task_text=text))
+                db.session.commit()
+            report(f"per-row add + commit ({len(per_row)} rows)", len(per_row), time.perf_counter() - started)
+
+        started = time.perf_counter()
+        response = client.post("/api/tasks/import", data={"file": (io.BytesIO(csv_file.encode()), "tasks.csv")})
+        assert response.get_json()["imported"] == rows
+        report("POST /api/tasks/import (chunked)", rows, time.perf_counter() - started)
+    finally:
+        with app.app_context():
+            Task.query.filter_by(user_id=user_id).delete()
+            User.query.filter_by(id=user_id).delete()
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
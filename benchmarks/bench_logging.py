@@ -0,0 +1,153 @@
+"""
+p50/p99 latency of concurrent requests under three logging set-ups:
+
+* the previous SingletonLogger: synchronous FileHandler at DEBUG plus console at INFO,
+  written on the request thread
+* the queue pipeline at DEBUG (same records, written by the QueueListener thread)
+* the queue pipeline at INFO, the production default (DEBUG calls are dropped unformatted)
+
+Each operation is a day view request followed by the classification of a page of
+GitHub repositories (served from memory), which logs one DEBUG line per repository.
+Log files go to a temporary directory. Console output is discarded after an optional
+delay per write, standing in for a slow sink such as a container's stdout pipe.
+
+Uses a throwaway benchmark user in the configured database and removes it afterwards.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_logging.py [operations_per_thread] [threads] [console_write_ms]
+"""
+import base64
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date
+
+from app.assignments import categorize_repos
+from app.logging_config import TEXT_FORMAT, configure_logging, stop_logging
+from app.wsgi import app
+from app.server import db, User, Task
+
+DAY = date(2024, 2, 1)
+REPOS = 30
+README = {'sha': 'abc', 'content': base64.b64encode(b"# Homework\nNo deadline here.").decode()}
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def json(self):
+        return README
+
+
+def fake_get(url, **kwargs):
+    return FakeResponse()
+
+
+class SlowSink:
+    """Discards what is written after `delay` seconds per write."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def write(self, text):
+        if self.delay:
+            time.sleep(self.delay)
+
+    def flush(self):
+        pass
+
+
+def legacy_logging(logger, log_file):
+    """The handlers SingletonLogger used to attach."""
+    stop_logging()
+    logger.handlers.clear()
+    logger.setLevel(logging.DEBUG)
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setLevel(logging.DEBUG)
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.INFO)
+    formatter = logging.Formatter(TEXT_FORMAT)
+    for handler in (file_handler, console_handler):
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+
+
+def queue_logging(level):
+    def setup(logger, log_file):
+        logger.handlers.clear()
+        configure_logging(logger, level, 'INFO', 'text', log_file)
+    return setup
+
+
+def run(label, setup, username, operations, threads):
+    logger = logging.getLogger("GoGiTracker")
+    latencies = []
+    lock = threading.Lock()
+    repos = [{'name': f'repo{i}', 'html_url': f'https://github.com/bench/repo{i}', 'pushed_at': None,
+              'owner': {'login': 'bench'}} for i in range(REPOS)]
+    day_url = f"/tasks/{DAY.year}/{DAY.month}/{DAY.day}"
+
+    def worker():
+        client = app.test_client()
+        client.post("/login", data={"username": username, "password": "benchpassword"})
+        own = []
+        for _ in range(operations):
+            started = time.perf_counter()
+            assert client.get(day_url).status_code == 200
+            categorize_repos(fake_get, repos, max_workers=4)
+            own.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(own)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup(logger, os.path.join(tmp, "bench.log"))
+        started = time.perf_counter()
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        stop_logging()
+        for handler in logger.handlers:
+            handler.close()
+        logger.handlers.clear()
+
+    p99 = statistics.quantiles(latencies, n=100)[98]
+    print(f"  {label:<40} {len(latencies) / elapsed:8.1f} ops/s   p50 {statistics.median(latencies) * 1000:7.2f} ms"
+          f"   p99 {p99 * 1000:7.2f} ms")
+
+
+def main(operations, threads, console_write_ms):
+    username = f"bench-{uuid.uuid4().hex[:8]}"
+    client = app.test_client()
+    client.post("/signup", data={"username": username, "password": "benchpassword"})
+    with app.app_context():
+        user_id = User.query.filter_by(username=username).one().id
+        db.session.add_all([Task(user_id=user_id, date=DAY, task_text=f"Seed task {i}") for i in range(20)])
+        db.session.commit()
+
+    sys.stderr = SlowSink(console_write_ms / 1000)  # Console handlers write here
+    try:
+        print(f"{threads} threads x {operations} operations ({REPOS} repositories classified per operation), "
+              f"{console_write_ms} ms per console write")
+        run("SingletonLogger (sync file, DEBUG)", legacy_logging, username, operations, threads)
+        run("Queue pipeline, DEBUG", queue_logging("DEBUG"), username, operations, threads)
+        run("Queue pipeline, INFO", queue_logging("INFO"), username, operations, threads)
+    finally:
+        sys.stderr = sys.__stderr__
+        with app.app_context():
+            Task.query.filter_by(user_id=user_id).delete()
+            User.query.filter_by(id=user_id).delete()
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200, int(sys.argv[2]) if len(sys.argv) > 2 else 8,
+         float(sys.argv[3]) if len(sys.argv) > 3 else 0)
@@ -0,0 +1,122 @@
+"""
+Read/write concurrency of SQLite with its default settings against the app's
+production engine profile (WAL, synchronous=NORMAL, busy timeout, cache/mmap
+sizes, pooled connections).
+
+Several processes, like gunicorn workers, hammer a throwaway database: writers
+add and complete tasks as tasks()/mark_finished() do, readers run the calendar
+and upcoming-tasks queries. Reports throughput, p99 latency and
+"database is locked" failures per role.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_sqlite_concurrency.py [seconds] [readers] [writers]
+"""
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.database import PRODUCTION_SQLITE_PRAGMAS, engine_options, install_sqlite_pragmas
+from app.server import db, Task
+
+USERS = 50
+SEED_TASKS = 50_000
+TODAY = date.today()
+
+READ = text(
+    "SELECT date, task_text FROM task WHERE user_id = :user_id AND status = 'In Progress' "
+    "AND date >= :start ORDER BY date LIMIT 10"
+)
+INSERT = text("INSERT INTO task (user_id, date, task_text, status) VALUES (:user_id, :date, 'load test', 'In Progress')")
+COMPLETE = text("UPDATE task SET status = 'Done' WHERE id = (SELECT max(id) FROM task WHERE user_id = :user_id)")
+
+
+def make_engine(path, tuned):
+    url = f"sqlite:///{path}"
+    if not tuned:
+        # SQLAlchemy's defaults for a SQLite file: no pool, rollback journal, 5 s driver timeout
+        return create_engine(url)
+    config = {'SQLALCHEMY_DATABASE_URI': url, 'DATABASE_POOL_SIZE': 5, 'DATABASE_MAX_OVERFLOW': 10,
+              'DATABASE_POOL_TIMEOUT': 30}
+    engine = create_engine(url, **engine_options(config))
+    install_sqlite_pragmas(engine, PRODUCTION_SQLITE_PRAGMAS)
+    return engine
+
+
+def seed(path):
+    engine = create_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine, tables=[db.metadata.tables['user'], Task.__table__])
+    rng = random.Random(1)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO user (id, username, password_hash) VALUES (:id, :name, 'x')"),
+                     [{"id": i, "name": f"user{i}"} for i in range(1, USERS + 1)])
+        conn.execute(INSERT, [{"user_id": rng.randint(1, USERS), "date": TODAY + timedelta(days=rng.randint(-300, 300))}
+                              for _ in range(SEED_TASKS)])
+    engine.dispose()
+
+
+def worker(path, tuned, role, seconds, results):
+    engine = make_engine(path, tuned)
+    rng = random.Random(os.getpid())
+    latencies = []
+    locked = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        user_id = rng.randint(1, USERS)
+        started = time.perf_counter()
+        try:
+            if role == "reader":
+                with engine.connect() as conn:
+                    conn.execute(READ, {"user_id": user_id, "start": TODAY}).fetchall()
+            else:
+                with engine.begin() as conn:
+                    conn.execute(INSERT, {"user_id": user_id, "date": TODAY})
+                with engine.begin() as conn:
+                    conn.execute(COMPLETE, {"user_id": user_id})
+        except OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            locked += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    results.put((role, latencies, locked))
+    engine.dispose()
+
+
+def run(label, tuned, seconds, readers, writers):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "load.db")
+        seed(path)
+        if tuned:
+            make_engine(path, True).connect().close()  # Switch the file to WAL before the workers start
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=worker, args=(path, tuned, role, seconds, results))
+                     for role in ["reader"] * readers + ["writer"] * writers]
+        for process in processes:
+            process.start()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+    print(f"\n=== {label} ({readers} readers, {writers} writers, {seconds}s) ===")
+    for role in ("reader", "writer"):
+        latencies = [l for r, ls, _ in collected if r == role for l in ls]
+        locked = sum(n for r, _, n in collected if r == role)
+        p99 = statistics.quantiles(latencies, n=100)[98] * 1000 if len(latencies) > 1 else float("nan")
+        print(f"  {role}s: {len(latencies) / seconds:9.1f} ops/s   p99 {p99:8.2f} ms   "
+              f"'database is locked': {locked}")
+
+
+if __name__ == "__main__":
+    seconds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    writers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    run("SQLite defaults", False, seconds, readers, writers)
+    run("Production profile", True, seconds, readers, writers)
@@ -0,0 +1,73 @@
+"""
+Cold-start cost of a worker: `import app.server` as reported by `python -X importtime`,
+then create_app() and the first request, each in a fresh interpreter.
+
+Prints the median of several runs and the modules that dominate the import.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_startup.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+STARTUP = """
+import time
+started = time.perf_counter()
+import app.server
+imported = time.perf_counter()
+flask_app = app.server.create_app()
+created = time.perf_counter()
+flask_app.test_client().get('/login')
+served = time.perf_counter()
+print(imported - started, created - imported, served - created)
+"""
+
+
+def import_times():
+    """(self_us, cumulative_us, module) for every import of `import app.server`."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.server"],
+                            capture_output=True, text=True, check=True, env=os.environ)
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        entries.append((int(self_us), int(cumulative_us), module[1:]))  # Indented by nesting depth
+    return entries
+
+
+def startup_phases():
+    result = subprocess.run([sys.executable, "-c", STARTUP], capture_output=True, text=True, check=True,
+                            env=os.environ)
+    return [float(value) for value in result.stdout.split()[-3:]]
+
+
+def main(runs):
+    totals = []
+    self_times = []
+    heaviest = {}
+    for _ in range(runs):
+        entries = import_times()
+        totals.append(next(cum for _, cum, module in entries if module == "app.server"))
+        self_times.append(next(own for own, _, module in entries if module == "app.server"))
+        for _, cumulative, module in entries:
+            if module.startswith("  ") and not module.startswith("   "):  # Imported by app.server itself
+                heaviest.setdefault(module.strip(), []).append(cumulative)
+
+    print(f"=== python -X importtime -c 'import app.server' (median of {runs}) ===")
+    print(f"  app.server total              {statistics.median(totals) / 1000:8.1f} ms")
+    print(f"  app.server self time          {statistics.median(self_times) / 1000:8.1f} ms")
+    print("  heaviest imports of app.server:")
+    for module, values in sorted(heaviest.items(), key=lambda item: -statistics.median(item[1]))[:8]:
+        print(f"    {module:36} {statistics.median(values) / 1000:8.1f} ms")
+
+    phases = [startup_phases() for _ in range(runs)]
+    print(f"\n=== Cold start (median of {runs}) ===")
+    for label, values in zip(("import app.server", "create_app()", "first request"), zip(*phases)):
+        print(f"  {label:28} {statistics.median(values) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,114 @@
+"""
+Benchmark of the hot Task queries with and without the composite
+(user_id, status, date) index.
+
+Builds a throwaway SQLite database per size, prints the EXPLAIN QUERY PLAN
+of each query shape and its median latency before and after the index is
+created.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_task_indexes.py [10000 100000 1000000]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, text
+
+from app.server import db, Task
+
+USERS = 200
+REPEAT = 20
+TODAY = date.today()
+
+QUERIES = {
+    "calendar (user, status, month)": (
+        "SELECT id, date, task_text FROM task "
+        "WHERE user_id = :user_id AND status = 'In Progress' "
+        "AND date >= :start AND date <= :end"
+    ),
+    "upcoming (user, status, date >= today ORDER BY date)": (
+        "SELECT id, date, task_text FROM task "
+        "WHERE user_id = :user_id AND status = 'In Progress' AND date >= :start "
+        "ORDER BY date LIMIT 10"
+    ),
+    "day view (user, date, status)": (
+        "SELECT id, task_text FROM task "
+        "WHERE user_id = :user_id AND date = :start AND status = 'Done'"
+    ),
+}
+
+
+def populate(engine, rows):
+    db.metadata.create_all(engine, tables=[db.metadata.tables['user'], Task.__table__])
+    for index in Task.__table__.indexes:
+        index.drop(bind=engine, checkfirst=True)
+
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO user (id, username, password_hash) VALUES (:id, :username, 'x')"),
+            [{"id": i, "username": f"user{i}"} for i in range(1, USERS + 1)],
+        )
+        chunk = []
+        for _ in range(rows):
+            chunk.append({
+                "user_id": rng.randint(1, USERS),
+                "date": (TODAY + timedelta(days=rng.randint(-1500, 365))).isoformat(),
+                "task_text": "benchmark task",
+                "status": "Done" if rng.random() < 0.7 else "In Progress",
+            })
+            if len(chunk) == 50000:
+                conn.execute(text(
+                    "INSERT INTO task (user_id, date, task_text, status) "
+                    "VALUES (:user_id, :date, :task_text, :status)"
+                ), chunk)
+                chunk = []
+        if chunk:
+            conn.execute(text(
+                "INSERT INTO task (user_id, date, task_text, status) "
+                "VALUES (:user_id, :date, :task_text, :status)"
+            ), chunk)
+
+
+def measure(engine, sql):
+    params = {"user_id": USERS // 2, "start": TODAY.replace(day=1).isoformat(),
+              "end": (TODAY.replace(day=1) + timedelta(days=31)).isoformat()}
+    with engine.connect() as conn:
+        plan = " / ".join(row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql), params))
+        timings = []
+        for _ in range(REPEAT):
+            started = time.perf_counter()
+            conn.execute(text(sql), params).fetchall()
+            timings.append(time.perf_counter() - started)
+    return plan, statistics.median(timings) * 1000
+
+
+def run(rows):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        populate(engine, rows)
+        print(f"\n=== {rows:,} tasks ===")
+        results = {name: [measure(engine, sql)] for name, sql in QUERIES.items()}
+        for index in Task.__table__.indexes:
+            index.create(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+        for name, sql in QUERIES.items():
+            results[name].append(measure(engine, sql))
+
+        for name, ((plan_before, ms_before), (plan_after, ms_after)) in results.items():
+            print(f"{name}")
+            print(f"  without index: {ms_before:8.3f} ms  plan: {plan_before}")
+            print(f"  with index:    {ms_after:8.3f} ms  plan: {plan_after}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    for size in sizes:
+        run(size)
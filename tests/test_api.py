@@ -0,0 +1,173 @@
+from app.wsgi import app
+from app.server import Task
+from conftest import login
+
+
+# --------------- Tasks API Tests ---------------
+
+def test_api_requires_login(client):
+    """Ensure the API answers 401 instead of redirecting when not logged in."""
+    response = client.get("/api/tasks")
+    assert response.status_code == 401
+    assert response.get_json() == {"error": "Authentication required."}
+
+
+def test_api_create_and_list_tasks(client):
+    """Test creating tasks and filtering them by date range and status."""
+    login(client)
+    for day, text in [("2024-02-01", "First"), ("2024-02-10", "Second"), ("2024-03-01", "Third")]:
+        response = client.post("/api/tasks", json={"date": day, "task_text": text})
+        assert response.status_code == 201
+    client.post("/api/tasks", json={"date": "2024-02-05", "task_text": "Finished", "status": "Done"})
+
+    response = client.get("/api/tasks?from=2024-02-01&to=2024-02-29&status=In Progress")
+
+    assert response.status_code == 200
+    assert [(t["date"], t["task_text"]) for t in response.get_json()["tasks"]] == [
+        ("2024-02-01", "First"), ("2024-02-10", "Second")
+    ]
+
+
+def test_api_list_tasks_pages_with_cursor(client):
+    """Test that tasks are listed a page at a time, following next_cursor to the end."""
+    login(client)
+    for day in ["2024-02-03", "2024-02-01", "2024-02-01", "2024-02-02", "2024-02-05"]:
+        client.post("/api/tasks", json={"date": day, "task_text": f"Due {day}"})
+
+    pages, cursor = [], None
+    while True:
+        body = client.get("/api/tasks", query_string={"limit": 2, **({"cursor": cursor} if cursor else {})}).get_json()
+        pages.append([(t["id"], t["date"]) for t in body["tasks"]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sum(pages, []) == [(2, "2024-02-01"), (3, "2024-02-01"), (4, "2024-02-02"), (1, "2024-02-03"),
+                              (5, "2024-02-05")]
+    assert client.get("/api/tasks?limit=0").status_code == 400
+    assert client.get("/api/tasks?limit=100000").status_code == 400
+    assert client.get("/api/tasks?cursor=yesterday").status_code == 400
+
+
+def test_api_rejects_invalid_payloads(client):
+    """Test that invalid dates, statuses and texts are rejected with 400."""
+    login(client)
+    assert client.post("/api/tasks", json={"date": "01/02/2024", "task_text": "Bad date"}).status_code == 400
+    assert client.post("/api/tasks", json={"date": "2024-02-01", "task_text": " "}).status_code == 400
+    assert client.post("/api/tasks", json={"date": "2024-02-01", "task_text": "x", "status": "Later"}).status_code == 400
+    assert client.get("/api/tasks?status=Later").status_code == 400
+    with app.app_context():
+        assert Task.query.count() == 0
+
+
+def test_api_update_task(client):
+    """Test marking a task as done and moving it with a PATCH."""
+    login(client)
+    task_id = client.post("/api/tasks", json={"date": "2024-02-01", "task_text": "Report"}).get_json()["id"]
+
+    response = client.patch(f"/api/tasks/{task_id}", json={"status": "Done", "date": "2024-02-02"})
+
+    assert response.status_code == 200
+    assert response.get_json() == {"id": task_id, "date": "2024-02-02", "task_text": "Report", "status": "Done"}
+
+
+def test_api_update_other_users_task(client):
+    """Ensure users cannot update tasks they do not own."""
+    login(client, "owner")
+    task_id = client.post("/api/tasks", json={"date": "2024-02-01", "task_text": "Private"}).get_json()["id"]
+    client.get("/logout")
+    login(client, "intruder")
+
+    response = client.patch(f"/api/tasks/{task_id}", json={"status": "Done"})
+
+    assert response.status_code == 404
+    with app.app_context():
+        assert Task.query.get(task_id).status == "In Progress"
+
+
+# --------------- Bulk Tasks API Tests ---------------
+
+def create_tasks(client, *tasks):
+    response = client.post("/api/tasks/batch", json={"tasks": [{"date": d, "task_text": t} for d, t in tasks]})
+    assert response.status_code == 201
+    return [task["id"] for task in response.get_json()["tasks"]]
+
+
+def test_api_batch_create_is_all_or_nothing(client):
+    """Test that a batch with one invalid task creates nothing and reports the bad index."""
+    login(client)
+    response = client.post("/api/tasks/batch", json={"tasks": [
+        {"date": "2024-02-01", "task_text": "Valid"},
+        {"date": "someday", "task_text": "Invalid"},
+    ]})
+
+    assert response.status_code == 400
+    assert list(response.get_json()["errors"]) == ["1"]
+    with app.app_context():
+        assert Task.query.count() == 0
+
+    assert len(create_tasks(client, ("2024-02-01", "One"), ("2024-02-02", "Two"))) == 2
+
+
+def test_api_bulk_complete_and_delete_by_ids(client):
+    """Test completing and deleting several tasks selected by id."""
+    login(client)
+    ids = create_tasks(client, ("2024-02-01", "A"), ("2024-02-02", "B"), ("2024-02-03", "C"))
+
+    response = client.post("/api/tasks/bulk", json={"action": "complete", "ids": ids[:2]})
+    assert response.get_json() == {"action": "complete", "count": 2, "ids": ids[:2]}
+    client.post("/api/tasks/bulk", json={"action": "delete", "ids": [ids[2]]})
+
+    with app.app_context():
+        assert [(t.id, t.status) for t in Task.query.order_by(Task.id)] == [(ids[0], "Done"), (ids[1], "Done")]
+
+
+def test_api_bulk_rejects_foreign_ids(client):
+    """Ensure a bulk request touching another user's task changes nothing."""
+    login(client, "owner")
+    foreign_id = create_tasks(client, ("2024-02-01", "Private"))[0]
+    client.get("/logout")
+    login(client, "intruder")
+    own_id = create_tasks(client, ("2024-02-01", "Mine"))[0]
+
+    response = client.post("/api/tasks/bulk", json={"action": "complete", "ids": [own_id, foreign_id]})
+
+    assert response.status_code == 404
+    assert response.get_json()["missing"] == [foreign_id]
+    with app.app_context():
+        assert {t.status for t in Task.query} == {"In Progress"}
+
+
+def test_api_bulk_rejects_bool_ids(client):
+    """Test that JSON true is not taken for task id 1, nor for a one-day shift."""
+    login(client)
+    task_id = create_tasks(client, ("2024-02-01", "First"))[0]
+    assert task_id == 1
+
+    response = client.post("/api/tasks/bulk", json={"action": "complete", "ids": [True]})
+    assert response.status_code == 400
+    response = client.post("/api/tasks/bulk", json={"action": "reschedule", "ids": [task_id], "shift_days": True})
+    assert response.status_code == 400
+    assert client.get("/api/tasks").get_json()["tasks"] == [
+        {"id": task_id, "date": "2024-02-01", "task_text": "First", "status": "In Progress"}
+    ]
+
+
+def test_api_bulk_reschedule_range(client):
+    """Test moving every pending task of a date range, by a shift and to a fixed date."""
+    login(client)
+    create_tasks(client, ("2024-02-01", "A"), ("2024-02-03", "B"), ("2024-03-01", "Outside"))
+
+    response = client.post("/api/tasks/bulk", json={
+        "action": "reschedule", "from": "2024-02-01", "to": "2024-02-29", "status": "In Progress", "shift_days": 7
+    })
+    assert response.get_json()["count"] == 2
+    tasks = client.get("/api/tasks").get_json()["tasks"]
+    assert [(t["date"], t["task_text"]) for t in tasks] == [
+        ("2024-02-08", "A"), ("2024-02-10", "B"), ("2024-03-01", "Outside")
+    ]
+
+    client.post("/api/tasks/bulk", json={"action": "reschedule", "from": "2024-02-01", "to": "2024-02-29",
+                                         "date": "2024-04-01"})
+    assert {t["date"] for t in client.get("/api/tasks?to=2024-04-30").get_json()["tasks"]} == {"2024-03-01", "2024-04-01"}
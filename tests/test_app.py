@@ -1,20 +1,18 @@
-import pytest
-from app.server import app, db, User, Task
-
+import threading
+import time
 
-@pytest.fixture
-def client():
-    """Set up a Flask test client and test database."""
-    app.config["TESTING"] = True
-    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"  # Use in-memory DB
-    app.config["SECRET_KEY"] = "test_secret"
+import pytest
+from flask import g, session
+from sqlalchemy import event, inspect
+from werkzeug.security import generate_password_hash
 
-    with app.test_client() as client:
-        with app.app_context():
-            db.create_all()
-        yield client
-        with app.app_context():
-            db.drop_all()
+from app.caching import LRUCache
+from app.database import engine_options, load_database_config
+from app.passwords import PasswordHasher, PasswordHasherBusy
+from conftest import login, query_count
+from app.wsgi import app
+from app.server import (create_app, db, User, Task, ensure_columns, ensure_indexes, month_task_previews, current_user,
+                        invalidate_current_user)
 
 
 # --------------- Authentication Tests ---------------
@@ -91,6 +89,97 @@ def test_logout(client):
         assert "user_id" not in sess  # Ensure session is cleared
 
 
+def test_current_user_memoized_per_request(client):
+    """Ensure the logged-in user is loaded once per request and can be invalidated."""
+    client.post("/signup", data={
+        "username": "cacheuser",
+        "password": "cachepassword"
+    })
+
+    with app.test_request_context("/"):
+        session["user_id"] = 1
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            user = current_user()
+            assert current_user() is user
+            assert g.user is user
+            assert len(statements) == 1
+
+            invalidate_current_user()
+            assert "user" not in g
+            session.pop("user_id")
+            assert current_user() is None
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+
+
+def test_login_throttled_per_username(client, monkeypatch):
+    """Test that a username with too many failed logins is refused without checking its password."""
+    client.post("/signup", data={"username": "throttleduser", "password": "rightpassword"})
+    for _ in range(app.config["LOGIN_MAX_FAILURES_PER_USERNAME"]):
+        assert client.post("/login", data={"username": "throttleduser", "password": "wrongpassword"}).status_code == 400
+
+    def unexpected_check(*args):
+        raise AssertionError("Throttled logins must not hash")
+
+    monkeypatch.setattr(app.extensions["password_hasher"], "check", unexpected_check)
+    response = client.post("/login", data={"username": "throttleduser", "password": "rightpassword"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert b"Too many failed login attempts" in response.data
+
+
+def test_login_throttled_per_forwarded_address(client):
+    """Test that failures for different usernames from one client address behind a proxy add up."""
+    assert "ip" not in app.extensions["login_throttles"]  # Opt-in: without ProxyFix all clients share an address
+    proxied_app = create_app({"LOGIN_MAX_FAILURES_PER_IP": 2, "PROXY_FIX_X_FOR": 1, "SECRET_KEY": "test_secret"})
+    proxied_app.config["TESTING"] = True
+
+    def failed_login(username, address):
+        with proxied_app.test_client() as proxied_client:
+            return proxied_client.post("/login", data={"username": username, "password": "wrongpassword"},
+                                       headers={"X-Forwarded-For": address}).status_code
+
+    assert failed_login("firstname", "203.0.113.1") == 400
+    assert failed_login("secondname", "203.0.113.1") == 400
+    assert failed_login("thirdname", "203.0.113.1") == 429
+    assert failed_login("thirdname", "203.0.113.2") == 400
+
+
+def test_password_rehashed_on_login(client):
+    """Test that a hash made with other parameters is replaced by one with the configured method at login."""
+    with app.app_context():
+        old_hash = generate_password_hash("oldpassword", "pbkdf2:sha256:1000")
+        db.session.add(User(username="olduser", password_hash=old_hash))
+        db.session.commit()
+
+    assert client.post("/login", data={"username": "olduser", "password": "oldpassword"}).status_code == 302
+
+    with app.app_context():
+        password_hash = User.query.filter_by(username="olduser").one().password_hash
+    assert password_hash.startswith(app.config["PASSWORD_HASH_METHOD"] + "$")
+    assert client.post("/login", data={"username": "olduser", "password": "oldpassword"}).status_code == 302
+
+
+def test_password_hasher_refuses_beyond_pending_limit():
+    """Test that the hasher raises instead of queueing more work than it was sized for."""
+    hasher = PasswordHasher(max_workers=1, max_pending=0)
+    release = threading.Event()
+    blocked = threading.Thread(target=hasher._run, args=(release.wait,))
+    blocked.start()
+    try:
+        time.sleep(0.05)
+        with pytest.raises(PasswordHasherBusy):
+            hasher.hash("password")
+    finally:
+        release.set()
+        blocked.join()
+    assert hasher.check(hasher.hash("password"), "password")
+    hasher.shutdown()
+
+
 # --------------- Task Management Tests ---------------
 
 def test_add_task(client):
@@ -159,6 +248,177 @@ def test_mark_task_done(client):
         assert updated_task.status == "Done"
 
 
+def test_calendar_shows_month_previews(client):
+    """Test that the calendar only shows the month's tasks, capped and truncated per day."""
+    client.post("/signup", data={
+        "username": "calendaruser",
+        "password": "calendarpassword"
+    })
+    client.post("/login", data={
+        "username": "calendaruser",
+        "password": "calendarpassword"
+    })
+
+    for text in ["First task", "Second task with a long name", "Third", "Fourth"]:
+        client.post("/tasks/2024/02/01", data={"task": text})
+    client.post("/tasks/2024/03/01", data={"task": "Next month"})
+
+    with app.app_context():
+        previews = month_task_previews(1, "In Progress", 2024, 2)
+    assert previews == {"2024-02-01": ["First task", "Second tas...", "Third"]}
+
+    response = client.get("/?year=2024&month=2")
+    assert response.status_code == 200
+    assert b"Second tas..." in response.data
+    assert b"Fourth" not in response.data
+    assert b"Next month" not in response.data
+
+
+def test_calendar_cached_until_tasks_change(client):
+    """Test that month previews are served from the cache until one of the user's tasks is written."""
+    client.post("/signup", data={"username": "cacheduser", "password": "cachedpassword"})
+    client.post("/login", data={"username": "cacheduser", "password": "cachedpassword"})
+    client.post("/tasks/2024/02/01", data={"task": "Cached"})
+
+    first = client.get("/?year=2024&month=2")
+    client.get("/?year=2024&month=3")
+    again = client.get("/?year=2024&month=2")
+    assert b"Cached" in again.data
+    assert query_count(again) == query_count(first) - 1
+
+    client.post("/tasks/2024/02/02", data={"task": "Fresh"})
+    after_write = client.get("/?year=2024&month=2")
+    assert b"Fresh" in after_write.data
+    assert query_count(after_write) == query_count(first)
+
+    with app.app_context():
+        task_id = Task.query.filter_by(task_text="Cached").one().id
+    client.post("/mark_finished?year=2024&month=2", data={"task_id": task_id})
+    assert b"Cached" not in client.get("/?year=2024&month=2").data
+    assert b"Cached" in client.get("/?year=2024&month=2&show_done=true").data
+
+    client.post("/api/tasks", json={"date": "2024-02-03", "task_text": "API task"})
+    assert b"API task" in client.get("/?year=2024&month=2").data
+
+
+def test_pages_answer_conditional_get(client):
+    """Test that unchanged calendar and day pages are answered with 304, without querying their tasks."""
+    client.post("/signup", data={"username": "etaguser", "password": "etagpassword"})
+    client.post("/login", data={"username": "etaguser", "password": "etagpassword"})
+
+    for url in ["/?year=2024&month=2", "/tasks/2024/2/1"]:
+        first = client.get(url)
+        etag = first.headers["ETag"]
+        assert first.headers["Cache-Control"] == "private, no-cache"
+
+        unchanged = client.get(url, headers={"If-None-Match": etag})
+        assert unchanged.status_code == 304
+        assert unchanged.data == b""
+        assert query_count(unchanged) == 1  # Loading the user
+
+        client.post("/tasks/2024/02/01", data={"task": "New"})
+        changed = client.get(url, headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert b"New" in changed.data
+        assert changed.headers["ETag"] != etag
+
+    assert client.get("/?year=2024&month=3").headers["ETag"] != client.get("/?year=2024&month=2").headers["ETag"]
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """Test that the LRU cache keeps its newest entries within its bound."""
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c"), len(cache)) == (1, 3, 2)
+
+
+def test_task_index_migrated(client):
+    """Ensure the composite Task indexes are added to databases created without them."""
+    with app.app_context():
+        for index in Task.__table__.indexes:
+            index.drop(bind=db.engine)
+        assert "ix_task_user_status_date" not in {i["name"] for i in inspect(db.engine).get_indexes("task")}
+
+        ensure_indexes()
+
+        indexes = {i["name"]: i["column_names"] for i in inspect(db.engine).get_indexes("task")}
+        assert indexes["ix_task_user_status_date"] == ["user_id", "status", "date"]
+        assert indexes["ix_task_user_date"] == ["user_id", "date", "id"]
+
+
+def test_missing_columns_migrated(client):
+    """Ensure nullable columns added to a model are added to existing tables."""
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql('ALTER TABLE "github_repository" DROP COLUMN "readme_sha"')
+
+        ensure_columns()
+
+        assert "readme_sha" in {c["name"] for c in inspect(db.engine).get_columns("github_repository")}
+
+
+def test_sqlite_production_profile(client):
+    """Ensure pooled SQLite connections run with the production pragmas."""
+    with app.app_context():
+        if db.engine.dialect.name != "sqlite":
+            pytest.skip("SQLite pragmas only apply to the SQLite backend")
+        assert type(db.engine.pool).__name__ == "QueuePool"
+        with db.engine.connect() as connection:
+            pragma = lambda name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+            assert pragma("journal_mode") == "wal"
+            assert pragma("synchronous") == 1  # NORMAL
+            assert pragma("busy_timeout") == 5000
+            assert pragma("cache_size") == -64000
+
+
+def test_create_app_defers_schema_to_init_db(tmp_path):
+    """Ensure building an app does not touch the database, and `flask init-db` creates the schema."""
+    path = tmp_path / "fresh.db"
+    fresh_app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}"})
+    assert not path.exists()
+
+    result = fresh_app.test_cli_runner().invoke(args=["init-db"])
+    assert result.exit_code == 0, result.output
+    with fresh_app.app_context():
+        tables = set(inspect(db.engine).get_table_names())
+        db.engine.dispose()
+    assert {"user", "task", "github_repository", "github_sync_state"} <= tables
+
+
+def test_database_config_from_environment():
+    """Ensure DATABASE_* environment variables override config.py and reach the engine options."""
+    config = {"SQLALCHEMY_DATABASE_URI": "sqlite:///config.db", "DATABASE_POOL_SIZE": 3}
+    load_database_config(config, {"DATABASE_URL": "postgres://app:secret@db/gogitracker",
+                                  "DATABASE_STATEMENT_TIMEOUT": "5000"})
+
+    assert config["SQLALCHEMY_DATABASE_URI"] == "postgresql://app:secret@db/gogitracker"
+    assert config["DATABASE_POOL_SIZE"] == 3
+    options = engine_options(config)
+    assert options["pool_size"] == 3 and options["pool_recycle"] == 30 * 60 and options["pool_pre_ping"]
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+
+def test_request_timing_counts_queries(client):
+    """Ensure each response reports its DB queries in Server-Timing and /metrics aggregates them per endpoint."""
+    login(client, "timeduser", "timedpassword")
+
+    response = client.get("/tasks/2024/2/1")
+    server_timing = response.headers["Server-Timing"]
+    assert server_timing.startswith("app;dur=")
+    assert 'github;dur=0.0;desc="0 calls"' in server_timing
+    assert query_count(response) >= 1
+
+    metrics = client.get("/metrics")
+    assert metrics.mimetype == "text/plain"
+    text = metrics.get_data(as_text=True)
+    assert 'gogitracker_request_duration_seconds_count{endpoint="tasks"}' in text
+    assert 'gogitracker_db_queries_total{endpoint="tasks"}' in text
+
+
 # --------------- Authorization Tests ---------------
 
 def test_unauthorized_task_access(client):
@@ -0,0 +1,495 @@
+import asyncio
+import base64
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from app import assignments
+from app.assignments import GitHubAPIError, RateLimitError, is_rate_limited, iter_user_repos
+from app.github_cache import GitHubResponseCache
+from app.wsgi import app
+from app.server import db, Task, User, GitHubRepository, GitHubSyncState, get_github_cache, users_due_for_sync
+from app.webhooks import sign_payload
+from conftest import login
+
+PAYLOADS = Path(__file__).parent / "payloads"
+
+CLASSROOM_README = (
+    "[![Review Assignment Due Date](https://classroom.github.com/assets/deadline-readme-button-24ddc0f5d75046c5622901739e7c5dd533143b0c8e959d652212380cedb1ea36.svg)]"
+    "(https://classroom.github.com/a/AbC123)\n# Homework 1\n"
+)
+
+
+def readme(text, sha=None):
+    return {"content": base64.b64encode(text.encode()).decode(), "sha": sha}
+
+
+def repo(name, owner="student", pushed_at=None):
+    return {"name": name, "owner": {"login": owner}, "html_url": f"https://github.com/{owner}/{name}",
+            "pushed_at": pushed_at}
+
+
+def login_with_github(client, username="githubuser"):
+    login(client, username)
+    with app.app_context():
+        user = User.query.filter_by(username=username).first()
+        user.github_token = "gho_test_token"
+        db.session.commit()
+
+
+# --------------- Repository Classification Tests ---------------
+
+def test_github_assignments_classifies_repos(client, fake_github):
+    """Test that repos are split into Classroom assignments and other projects."""
+    login_with_github(client)
+    fake_github.add("/user/repos", [repo("hw1"), repo("pet-project"), repo("no-readme")])
+    fake_github.add("/repos/student/hw1/contents/README.md", readme(CLASSROOM_README))
+    fake_github.add("/repos/student/pet-project/contents/README.md", readme("# Just a project"))
+
+    response = client.get("/github-assignments")
+
+    assert response.status_code == 200
+    assert b"https://classroom.github.com/a/AbC123" in response.data
+    assert b"pet-project" in response.data
+    assert b"no-readme" in response.data
+    assert all(headers["Authorization"] == "Bearer gho_test_token" for _, _, headers in fake_github.requests)
+
+
+def test_github_assignments_fetches_readmes_concurrently(client, fake_github):
+    """Test that README requests overlap instead of running back to back."""
+    login_with_github(client)
+    repos = [repo(f"hw{i}") for i in range(8)]
+    fake_github.add("/user/repos", repos)
+    for r in repos:
+        fake_github.add(f"/repos/student/{r['name']}/contents/README.md", readme(CLASSROOM_README), delay=0.3)
+
+    started = time.perf_counter()
+    response = client.get("/github-assignments")
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    assert response.data.count(b"Review Deadline") == 8
+    assert elapsed < 8 * 0.3 / 2
+
+
+def test_github_assignments_renders_partial_results_on_timeout(client, fake_github, monkeypatch):
+    """Test that repos whose README exceeds the time budget are still listed."""
+    monkeypatch.setitem(app.config, "GITHUB_README_BUDGET", 0.5)
+    login_with_github(client)
+    fake_github.add("/user/repos", [repo("fast-hw"), repo("slow-hw")])
+    fake_github.add("/repos/student/fast-hw/contents/README.md", readme(CLASSROOM_README))
+    fake_github.add("/repos/student/slow-hw/contents/README.md", readme(CLASSROOM_README), delay=2)
+
+    started = time.perf_counter()
+    response = client.get("/github-assignments")
+
+    assert time.perf_counter() - started < 2
+    assert response.status_code == 200
+    assert response.data.count(b"Review Deadline") == 1
+    assert b"slow-hw" in response.data
+
+
+# --------------- Repository Pagination Tests ---------------
+
+def test_github_assignments_follows_pagination(client, fake_github):
+    """Test that repositories on every page of /user/repos are listed."""
+    login_with_github(client)
+    fake_github.add("/user/repos?per_page=100", [repo("page1-repo")],
+                    headers={"Link": f'<{fake_github.url}user/repos?per_page=100&page=2>; rel="next"'})
+    fake_github.add("/user/repos?per_page=100&page=2", [repo("page2-repo")],
+                    headers={"Link": f'<{fake_github.url}user/repos?per_page=100&page=1>; rel="prev"'})
+
+    response = client.get("/github-assignments")
+
+    assert response.status_code == 200
+    assert b"page1-repo" in response.data
+    assert b"page2-repo" in response.data
+
+
+def test_iter_user_repos_is_lazy(fake_github):
+    """Test that the first page is yielded before the next page is requested."""
+    fake_github.add("/user/repos?per_page=100", [repo("first"), repo("second")],
+                    headers={"Link": f'<{fake_github.url}user/repos?per_page=100&page=2>; rel="next"'})
+    fake_github.add("/user/repos?per_page=100&page=2", {"message": "Server Error"}, status=500)
+
+    repos = iter_user_repos(app.extensions["github_clients"].for_token("t").get)
+
+    assert next(repos)["name"] == "first"
+    assert next(repos)["name"] == "second"
+    assert len(fake_github.requests) == 1
+    with pytest.raises(GitHubAPIError):
+        next(repos)
+
+
+def graphql_page(repos, end_cursor=None):
+    """A GraphQL answer listing `repos`, given as (name, readme text or None) pairs."""
+    nodes = [{"name": name, "url": f"https://github.com/student/{name}", "pushedAt": "2024-02-01T10:00:00Z",
+              "owner": {"login": "student"}, "object": {"oid": f"sha-{name}", "text": text} if text else None}
+             for name, text in repos]
+    page_info = {"hasNextPage": end_cursor is not None, "endCursor": end_cursor}
+    return 200, {"data": {"viewer": {"repositories": {"pageInfo": page_info, "nodes": nodes}}}}, {}
+
+
+def test_graphql_sync_fetches_readmes_with_listing(client, fake_github, monkeypatch):
+    """Test that GraphQL mode classifies repositories from one request per 100 repositories."""
+    monkeypatch.setitem(app.config, "GITHUB_FETCH_MODE", "graphql")
+    login_with_github(client)
+    fake_github.add_sequence("/graphql", [
+        graphql_page([("hw1", CLASSROOM_README), ("pet-project", "# Just a project")], end_cursor="cursor-1"),
+        graphql_page([("no-readme", None)]),
+    ])
+
+    response = client.get("/github-assignments")
+
+    assert b"https://classroom.github.com/a/AbC123" in response.data
+    assert b"pet-project" in response.data and b"no-readme" in response.data
+    assert fake_github.paths() == ["/graphql", "/graphql"]
+    assert [body["variables"]["cursor"] for body in fake_github.posted] == [None, "cursor-1"]
+    with app.app_context():
+        assert GitHubRepository.query.filter_by(name="hw1").one().readme_sha == "sha-hw1"
+
+
+def test_graphql_sync_falls_back_to_rest(client, fake_github, monkeypatch):
+    """Test that a failing GraphQL request is followed by a REST sync."""
+    monkeypatch.setitem(app.config, "GITHUB_FETCH_MODE", "graphql")
+    login_with_github(client)
+    fake_github.add("/graphql", {"message": "Not Found"}, status=404)
+    fake_github.add("/user/repos", [repo("hw1")])
+    fake_github.add("/repos/student/hw1/contents/README.md", readme(CLASSROOM_README))
+
+    response = client.get("/github-assignments")
+
+    assert b"https://classroom.github.com/a/AbC123" in response.data
+    assert fake_github.paths() == ["/graphql", "/user/repos", "/repos/student/hw1/contents/README.md"]
+
+
+
+def test_fetch_readmes_streams_with_bounded_window():
+    """Test that README results come out in order while the listing is read only a window ahead."""
+    listed = []
+
+    def repos():
+        for i in range(100):
+            listed.append(i)
+            yield repo(f"hw{i}")
+
+    def get(url, timeout=None):
+        return url
+
+    results = assignments.fetch_readmes(get, repos(), max_workers=2, skip=lambda r: r["name"] == "hw1")
+
+    assert next(results) == (repo("hw0"), "/repos/student/hw0/contents/README.md")
+    assert len(listed) == 4  # 2 * max_workers
+    assert next(results) == (repo("hw1"), None)
+    assert [r["name"] for r, _ in results] == [f"hw{i}" for i in range(2, 100)]
+
+
+# --------------- Response Cache Tests ---------------
+
+def test_github_assignments_revalidates_with_etags(client, fake_github):
+    """Test that a refresh is served from the cache through 304 answers."""
+    login_with_github(client)
+    fake_github.add("/user/repos", [repo("hw1")], headers={"ETag": '"repos-v1"'})
+    fake_github.add("/repos/student/hw1/contents/README.md", readme(CLASSROOM_README), headers={"ETag": '"readme-v1"'})
+
+    first = client.get("/github-assignments")
+    client.post("/github-assignments/refresh")
+    app.extensions["assignment_sync"].run_once()
+    second = client.get("/github-assignments")
+
+    assert first.data == second.data
+    assert b"https://classroom.github.com/a/AbC123" in second.data
+    assert [headers.get("If-None-Match") for _, _, headers in fake_github.requests[2:]] == ['"repos-v1"', '"readme-v1"']
+    stats = get_github_cache().stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+
+
+def test_github_cache_evicts_least_recently_used(fake_github, tmp_path):
+    """Test that each user's cache is bounded and evicts the least recently used bodies."""
+    cache = GitHubResponseCache(str(tmp_path / "cache.db"), max_bytes_per_user=150)
+    for name in ("a", "b", "c"):
+        fake_github.add(f"/{name}", {"data": name * 50}, headers={"ETag": f'"{name}"'})
+    get = cache.wrap(app.extensions["github_clients"].for_token("t").get, user_key=1)
+    other_user_get = cache.wrap(app.extensions["github_clients"].for_token("t").get, user_key=2)
+
+    get("/a")
+    other_user_get("/a")
+    get("/b")
+    get("/c")
+    fake_github.requests.clear()
+    assert get("/c").json() == {"data": "c" * 50}
+    get("/a")
+    other_user_get("/a")
+
+    conditional = [headers.get("If-None-Match") for _, _, headers in fake_github.requests]
+    assert conditional == ['"c"', None, '"a"']
+    assert cache.stats()["evictions"] == 2
+    cache.close()
+
+
+# --------------- Background Sync Tests ---------------
+
+def test_github_assignments_reads_synced_repositories(client, fake_github):
+    """Test that only the first visit calls GitHub and later visits read the synced table."""
+    login_with_github(client)
+    fake_github.add("/user/repos", [repo("hw1"), repo("pet-project")])
+    fake_github.add("/repos/student/hw1/contents/README.md", readme(CLASSROOM_README))
+
+    client.get("/github-assignments")
+    fake_github.requests.clear()
+    response = client.get("/github-assignments")
+
+    assert response.status_code == 200
+    assert fake_github.requests == []
+    assert b"https://classroom.github.com/a/AbC123" in response.data
+    assert b"pet-project" in response.data
+    assert b"Last synced at: never" not in response.data
+    with app.app_context():
+        assert GitHubRepository.query.filter(GitHubRepository.classroom_url.isnot(None)).count() == 1
+
+
+def test_github_sync_backs_off_when_rate_limited(client, fake_github):
+    """Test that a rate-limited user is not synced again until the limit resets."""
+    login_with_github(client)
+    reset = int((datetime.now() + timedelta(hours=1)).timestamp())
+    fake_github.add("/user/repos", {"message": "API rate limit exceeded"}, status=403,
+                    headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(reset)})
+
+    response = client.get("/github-assignments")
+    assert response.status_code == 400
+    assert b"Failed to fetch GitHub repositories" in response.data
+    with app.app_context():
+        state = db.session.get(GitHubSyncState, 1)
+        assert state.backoff_until == datetime.fromtimestamp(reset)
+        assert users_due_for_sync() == []
+
+    fake_github.requests.clear()
+    client.post("/github-assignments/refresh")
+    assert fake_github.requests == []
+
+
+def test_sync_worker_syncs_due_users(client, fake_github, monkeypatch):
+    """Test that the background worker syncs linked users and serves on-demand requests."""
+    sync_worker = app.extensions["assignment_sync"]
+    login_with_github(client)
+    fake_github.add("/user/repos", [repo("hw1")])
+    fake_github.add("/repos/student/hw1/contents/README.md", readme(CLASSROOM_README))
+
+    with app.app_context():
+        assert users_due_for_sync() == [1]
+    assert sync_worker.run_once() == 1
+    with app.app_context():
+        assert users_due_for_sync() == []
+        assert GitHubRepository.query.count() == 1
+
+    fake_github.add("/user/repos", [repo("hw1"), repo("hw2")])
+    monkeypatch.setattr(sync_worker, "interval", 3600)
+    sync_worker.start()
+    try:
+        sync_worker.request(1)
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            with app.app_context():
+                if GitHubRepository.query.count() == 2:
+                    break
+            time.sleep(0.05)
+    finally:
+        sync_worker.stop(timeout=5)
+    with app.app_context():
+        assert GitHubRepository.query.count() == 2
+
+
+def test_github_sync_skips_unchanged_repositories(client, fake_github, monkeypatch):
+    """Test that unpushed repos are not fetched and unchanged READMEs are not re-scanned."""
+    login_with_github(client)
+    fake_github.add("/user/repos", [repo("hw1", pushed_at="2024-02-01T10:00:00Z"),
+                                    repo("hw2", pushed_at="2024-02-01T10:00:00Z")])
+    fake_github.add("/repos/student/hw1/contents/README.md", readme(CLASSROOM_README, sha="aaa"))
+    fake_github.add("/repos/student/hw2/contents/README.md", readme(CLASSROOM_README, sha="bbb"))
+    client.get("/github-assignments")
+
+    scans = []
+    find_classroom_url = assignments.find_classroom_url
+    monkeypatch.setattr(assignments, "find_classroom_url", lambda text: scans.append(text) or find_classroom_url(text))
+    fake_github.requests.clear()
+    # hw1 was pushed without touching the README, hw2 was not pushed at all
+    fake_github.add("/user/repos", [repo("hw1", pushed_at="2024-02-02T10:00:00Z"),
+                                    repo("hw2", pushed_at="2024-02-01T10:00:00Z")])
+    queued = client.post("/github-assignments/refresh", follow_redirects=True)
+    assert fake_github.requests == []  # Left to the worker
+    assert b"(refresh queued)" in queued.data
+    assert app.extensions["assignment_sync"].run_once() == 1
+    response = client.get("/github-assignments")
+
+    assert fake_github.paths() == ["/user/repos", "/repos/student/hw1/contents/README.md"]
+    assert scans == []
+    assert response.data.count(b"Review Deadline") == 2
+    with app.app_context():
+        assert GitHubRepository.query.filter_by(name="hw1").one().pushed_at == "2024-02-02T10:00:00Z"
+
+
+# --------------- Webhook Tests ---------------
+
+def deliver(client, event, body, secret="webhook_secret"):
+    return client.post("/github-webhook", data=body, content_type="application/json",
+                       headers={"X-GitHub-Event": event, "X-Hub-Signature-256": sign_payload(secret, body)})
+
+
+def test_webhook_push_reclassifies_only_the_pushed_repository(client, fake_github, monkeypatch):
+    """Test that a recorded push delivery re-fetches that repository's README and nothing else."""
+    monkeypatch.setitem(app.config, "GITHUB_WEBHOOK_SECRET", "webhook_secret")
+    login_with_github(client)
+    fake_github.add("/user/repos", [repo("hw1", pushed_at="2024-02-01T10:00:00Z"),
+                                    repo("hw2", pushed_at="2024-02-01T10:00:00Z")])
+    fake_github.add("/repos/student/hw1/contents/README.md", readme("# Homework 1", sha="aaa"))
+    fake_github.add("/repos/student/hw2/contents/README.md", readme(CLASSROOM_README, sha="bbb"))
+    client.get("/github-assignments")
+    fake_github.requests.clear()
+    fake_github.add("/repos/student/hw1/contents/README.md", readme(CLASSROOM_README, sha="ccc"))
+
+    response = deliver(client, "push", (PAYLOADS / "push.json").read_bytes())
+    app.extensions["github_webhooks"].join()
+
+    assert response.status_code == 202
+    assert fake_github.paths() == ["/repos/student/hw1/contents/README.md"]
+    with app.app_context():
+        hw1 = GitHubRepository.query.filter_by(name="hw1").one()
+        assert hw1.classroom_url == "https://classroom.github.com/a/AbC123"
+        assert (hw1.pushed_at, hw1.readme_sha) == ("2024-02-02T10:00:00Z", "ccc")
+        assert GitHubRepository.query.filter(GitHubRepository.classroom_url.isnot(None)).count() == 2
+
+
+def test_webhook_rejects_unsigned_and_ignores_other_deliveries(client, fake_github, monkeypatch):
+    """Test signature checks, the disabled endpoint and deliveries with nothing to apply."""
+    body = (PAYLOADS / "push.json").read_bytes()
+    assert deliver(client, "push", body).status_code == 404  # No GITHUB_WEBHOOK_SECRET
+
+    monkeypatch.setitem(app.config, "GITHUB_WEBHOOK_SECRET", "webhook_secret")
+    assert deliver(client, "push", body, secret="wrong_secret").status_code == 401
+    assert client.post("/github-webhook", data=body, headers={"X-GitHub-Event": "push"}).status_code == 401
+    non_ascii = {"X-GitHub-Event": "push", "X-Hub-Signature-256": "sha256=\xff"}
+    assert client.post("/github-webhook", data=body, headers=non_ascii).status_code == 401
+    assert deliver(client, "ping", b'{"zen": "Keep it logically awesome."}').status_code == 200
+    feature_branch = body.replace(b'"ref": "refs/heads/main"', b'"ref": "refs/heads/feature"')
+    assert deliver(client, "push", feature_branch).get_json()["status"] == "ignored"
+    app.extensions["github_webhooks"].join()
+    assert fake_github.requests == []
+
+
+def test_replayed_rename_moves_repository_and_keeps_tasks(client, fake_github, monkeypatch):
+    """Test replaying a recorded rename with the replay-webhook command."""
+    monkeypatch.setitem(app.config, "GITHUB_WEBHOOK_SECRET", "webhook_secret")
+    login_with_github(client)
+    fake_github.add("/user/repos", [repo("hw1", pushed_at="2024-02-01T10:00:00Z")])
+    fake_github.add("/repos/student/hw1/contents/README.md", readme(CLASSROOM_README, sha="aaa"))
+    client.get("/github-assignments")
+    client.post("/add_repo_task/hw1", data={"task_date": "2024-02-10"})
+    fake_github.requests.clear()
+
+    result = app.test_cli_runner().invoke(
+        args=["replay-webhook", "repository", str(PAYLOADS / "repository_renamed.json")])
+
+    assert result.exit_code == 0, result.output
+    assert result.output.startswith("202 ACCEPTED")
+    assert fake_github.requests == []  # Not pushed since it was classified
+    with app.app_context():
+        renamed = GitHubRepository.query.one()
+        assert (renamed.name, renamed.url) == ("hw1-final", "https://github.com/student/hw1-final")
+        assert renamed.classroom_url == "https://classroom.github.com/a/AbC123"
+        assert Task.query.one().task_text == "hw1"  # Typed text, not a link to the repository
+
+
+# --------------- Client Tests ---------------
+
+def test_github_client_retries_server_errors(fake_github):
+    """Test that 5xx answers are retried on the same kept-alive connection."""
+    fake_github.add_sequence("/user", [(502, {"message": "Bad Gateway"}, {}), (503, {"message": "Unavailable"}, {}),
+                                       (200, {"login": "student"}, {})])
+    client = app.extensions["github_clients"].for_token("t")
+
+    response = client.get("/user")
+
+    assert response.status_code == 200
+    assert response.json() == {"login": "student"}
+    assert len(fake_github.requests) == 3
+    assert len(set(fake_github.ports)) == 1
+
+
+def test_github_client_honors_retry_after(fake_github, monkeypatch):
+    """Test that a short Retry-After is waited out and a long one is left to the caller."""
+    monkeypatch.setattr(app.extensions["github_clients"], "max_wait", 5)
+    client = app.extensions["github_clients"].for_token("t")
+    fake_github.add_sequence("/user", [(429, {"message": "Slow down"}, {"Retry-After": "0"}),
+                                       (200, {"login": "student"}, {})])
+    assert client.get("/user").status_code == 200
+
+    fake_github.add("/user/repos", {"message": "Slow down"}, status=429, headers={"Retry-After": "60"})
+    assert client.get("/user/repos").status_code == 429
+    assert fake_github.paths().count("/user/repos") == 1
+
+
+def test_github_client_stops_at_exhausted_rate_limit(fake_github):
+    """Test that once X-RateLimit-Remaining reaches 0 no request is sent until the reset."""
+    reset = str(int(time.time()) + 3600)
+    fake_github.add("/user", {"login": "student"}, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset})
+    client = app.extensions["github_clients"].for_token("t")
+
+    assert client.get("/user").status_code == 200
+    refused = client.get("/user/repos")
+
+    assert is_rate_limited(refused)
+    assert RateLimitError(refused).retry_at == datetime.fromtimestamp(int(reset))
+    assert fake_github.paths() == ["/user"]
+    assert app.extensions["github_clients"].for_token("other").get("/user").status_code == 200
+
+
+def test_github_client_async_api(fake_github):
+    """Test that aget() answers like get() from a coroutine."""
+    fake_github.add("/user", {"login": "student"})
+    client = app.extensions["github_clients"].for_token("t")
+
+    async def fetch_both():
+        return await asyncio.gather(client.aget("/user"), client.aget("/user"))
+
+    assert [response.json() for response in asyncio.run(fetch_both())] == [{"login": "student"}] * 2
+    assert all(headers["Authorization"] == "Bearer t" for _, _, headers in fake_github.requests)
+
+
+def test_github_login_uses_each_users_credentials(client):
+    """Test that the OAuth redirect carries the logged-in user's own client id, without shared state."""
+    for username in ("first", "second"):
+        client.post("/signup", data={"username": username, "password": "githubpassword"})
+        client.post("/login", data={"username": username, "password": "githubpassword"})
+        client.post("/link-github", data={"github_client_id": f"{username}-id", "github_client_secret": "secret"})
+
+        response = client.get("/github-login")
+        assert f"client_id={username}-id" in response.headers["Location"]
+
+
+# --------------- Instrumentation Tests ---------------
+
+def github_calls_metric(metrics):
+    sample = 'gogitracker_github_requests_total{endpoint="github_assignments"} '
+    return next((int(line[len(sample):]) for line in metrics.splitlines() if line.startswith(sample)), 0)
+
+
+def test_github_calls_reported_in_server_timing_and_metrics(client, fake_github):
+    """Test that the GitHub calls of a sync show up in Server-Timing and /metrics."""
+    login_with_github(client)
+    fake_github.add("/user/repos", [repo("hw1"), repo("hw2")])
+    fake_github.add("/repos/student/hw1/contents/README.md", readme(CLASSROOM_README))
+    fake_github.add("/repos/student/hw2/contents/README.md", readme("# Notes"))
+
+    # Metrics are totals since start-up, other tests' calls included
+    calls_before = github_calls_metric(client.get("/metrics").get_data(as_text=True))
+
+    response = client.get("/github-assignments")
+
+    assert 'github;dur=' in response.headers["Server-Timing"]
+    assert 'desc="3 calls"' in response.headers["Server-Timing"]
+    metrics = client.get("/metrics").get_data(as_text=True)
+    assert github_calls_metric(metrics) == calls_before + 3
+    assert 'gogitracker_requests_total{endpoint="github_assignments",method="GET",status="200"}' in metrics
@@ -0,0 +1,70 @@
+import json
+import logging
+import time
+
+import pytest
+
+from app.logging_config import configure_logging, stop_logging
+from app.wsgi import app
+
+
+@pytest.fixture
+def test_logger():
+    """A logger routed through the queue pipeline, restored to the app's settings afterwards."""
+    test_logger = logging.getLogger("GoGiTracker-test")
+    test_logger.propagate = False
+    yield test_logger
+    stop_logging()
+    configure_logging(logging.getLogger("GoGiTracker"), app.config["LOG_LEVEL"], app.config["LOG_CONSOLE_LEVEL"],
+                      app.config["LOG_FORMAT"], app.config["LOG_FILE"], app.config["LOG_MAX_BYTES"],
+                      app.config["LOG_BACKUP_COUNT"])
+
+
+def test_json_records_written_by_listener(tmp_path, test_logger):
+    """Test that queued records reach the file as JSON lines, formatted lazily and filtered by level."""
+    log_file = tmp_path / "app.log"
+    configure_logging(test_logger, "INFO", "CRITICAL", "json", str(log_file))
+
+    class Unformattable:
+        def __str__(self):
+            raise AssertionError("DEBUG arguments must not be formatted at INFO level")
+
+    test_logger.debug("Skipped %s", Unformattable())
+    test_logger.info("Imported %s tasks for user %s.", 3, "alice", extra={"user_id": 7})
+    stop_logging()
+
+    [line] = log_file.read_text().splitlines()
+    entry = json.loads(line)
+    assert entry["level"] == "INFO"
+    assert entry["message"] == "Imported 3 tasks for user alice."
+    assert entry["user_id"] == 7
+
+
+def test_log_file_rotates(tmp_path, test_logger):
+    """Test that the log file is rotated once it exceeds its size limit."""
+    log_file = tmp_path / "app.log"
+    configure_logging(test_logger, "DEBUG", "CRITICAL", "text", str(log_file), max_bytes=500, backup_count=2)
+
+    for number in range(50):
+        test_logger.debug("Line %s of the rotation test", number)
+    stop_logging()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["app.log", "app.log.1", "app.log.2"]
+    assert "Line 49 of the rotation test" in log_file.read_text()
+
+
+def test_unrotated_log_file_reopened_after_external_rotation(tmp_path, test_logger):
+    """Test that with max_bytes=0 the file is reopened once moved away, as logrotate does."""
+    log_file = tmp_path / "app.log"
+    configure_logging(test_logger, "INFO", "CRITICAL", "text", str(log_file), max_bytes=0)
+
+    test_logger.info("Before rotation")
+    deadline = time.monotonic() + 5
+    while not log_file.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    log_file.rename(tmp_path / "app.log.1")
+    test_logger.info("After rotation")
+    stop_logging()
+
+    assert "Before rotation" in (tmp_path / "app.log.1").read_text()
+    assert "After rotation" in log_file.read_text()
@@ -0,0 +1,49 @@
+import pytest
+
+from app.wsgi import app
+from app.server import create_app
+from conftest import login
+
+
+@pytest.fixture
+def profiling_client(client, tmp_path):
+    """A client of an app with profiling enabled for the user 'admin', sharing the test database."""
+    profiling_app = create_app({"PROFILER_ENABLED": True, "PROFILER_ADMINS": ("admin",),
+                                "PROFILER_DIR": str(tmp_path), "PROFILER_MAX_FILES": 2, "SECRET_KEY": "test_secret"})
+    profiling_app.config["TESTING"] = True
+    with profiling_app.test_client() as profiling_client:
+        yield profiling_client
+
+
+def test_admin_profiles_request_into_bounded_ring(profiling_client, tmp_path):
+    """Test that ?profile=1 from an admin saves a profile, keeping only the newest files."""
+    login(profiling_client, "admin")
+
+    names = [profiling_client.get("/?profile=1").headers["X-Profile"] for _ in range(3)]
+
+    assert all(name.endswith(".prof") and "_index_admin_" in name for name in names)
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(names[1:])
+    assert "X-Profile" not in profiling_client.get("/").headers
+
+    listing = profiling_client.get("/profiles")
+    assert listing.status_code == 200
+    assert names[2].encode() in listing.data
+    summary = profiling_client.get(f"/profiles/{names[2]}?format=text")
+    assert b"function calls" in summary.data
+    assert profiling_client.get(f"/profiles/{names[2]}").data == (tmp_path / names[2]).read_bytes()
+    assert profiling_client.get("/profiles/..%2Fusers.db").status_code == 404
+
+
+def test_profiling_is_admin_only(profiling_client):
+    """Test that other users can neither trigger profiles nor list them."""
+    login(profiling_client, "someone")
+
+    assert "X-Profile" not in profiling_client.get("/?profile=1").headers
+    assert profiling_client.get("/profiles").status_code == 404
+
+
+def test_profiler_disabled_installs_no_hooks(client):
+    """Test that the default app has no profiling hooks and no profile pages."""
+    hooks = [function.__name__ for function in app.before_request_funcs.get(None, [])]
+    assert "start_profile" not in hooks
+    assert client.get("/profiles").status_code == 404
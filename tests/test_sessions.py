@@ -0,0 +1,122 @@
+import time
+
+import pytest
+
+from app.wsgi import app
+from app.server import create_app
+from app.sessions import MemorySessionBackend, RedisSessionBackend, ServerSideSessionInterface, SQLiteSessionBackend
+from conftest import login, query_count
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.Redis commands the session backend uses."""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, name):
+        value, expires = self.values.get(name, (None, None))
+        if expires is not None and expires <= time.time():
+            del self.values[name]
+            return None
+        return value
+
+    def set(self, name, value, ex=None):
+        self.values[name] = (value.encode(), time.time() + ex if ex else None)
+
+    def delete(self, *names):
+        for name in names:
+            self.values.pop(name, None)
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemorySessionBackend(max_entries=2)
+    if request.param == "sqlite":
+        return SQLiteSessionBackend(str(tmp_path / "sessions.db"))
+    return RedisSessionBackend(FakeRedis())
+
+
+def test_session_backend_roundtrip(backend, monkeypatch):
+    """Test that every backend stores, expires and deletes sessions."""
+    backend.save("first", '{"user_id": 1}', ttl=60)
+    backend.save("expired", '{"user_id": 2}', ttl=1)
+    later = time.time() + 2
+    monkeypatch.setattr(time, "time", lambda: later)
+
+    assert backend.load("first") == '{"user_id": 1}'
+    assert backend.load("expired") is None
+    assert backend.load("unknown") is None
+    backend.delete("first")
+    assert backend.load("first") is None
+
+
+def test_identity_served_from_session(client):
+    """Test that API requests take the user's identity from the session instead of the database."""
+    login(client)
+
+    client.get("/api/tasks")  # Caches the identity
+    response = client.get("/api/tasks")
+    assert response.status_code == 200
+    assert query_count(response) == 1  # The tasks only
+
+
+def test_cookie_sessions_by_default():
+    """Test that sessions stay in signed cookies unless a server-side backend is configured."""
+    assert not isinstance(app.session_interface, ServerSideSessionInterface)
+
+
+@pytest.fixture
+def memory_client(client):
+    """A test client of an app keeping its sessions in memory, on the test database."""
+    memory_app = create_app({"SESSION_BACKEND": "memory", "SECRET_KEY": "test_secret"})
+    memory_app.config["TESTING"] = True
+    with memory_app.test_client() as memory_client:
+        yield memory_client
+
+
+def test_login_issues_new_session_id_and_logout_deletes_session(memory_client):
+    """Test that login rotates the session id and logout removes the stored session."""
+    client = memory_client
+    client.get("/login")
+    with client.session_transaction() as sess:
+        sess["planted"] = True
+    planted_sid = client.get_cookie("session").value
+
+    login(client)
+    sid = client.get_cookie("session").value
+    backend = client.application.session_interface.backend
+    assert sid != planted_sid
+    assert backend.load(planted_sid) is None
+    assert backend.load(sid) is not None
+
+    client.get("/logout")
+    assert backend.load(sid) is None
+    client.set_cookie("session", sid)
+    assert client.get("/api/tasks").status_code == 401
+
+
+def test_credential_change_invalidates_identity(client):
+    """Test that linking GitHub credentials drops the identity cached in the session."""
+    login(client)
+    client.get("/api/tasks")
+    with client.session_transaction() as sess:
+        assert sess["identity"]["github_linked"] is False
+
+    client.post("/link-github", data={"github_client_id": "id", "github_client_secret": "secret"})
+    with client.session_transaction() as sess:
+        assert "identity" not in sess
+
+
+def test_redis_session_backend_in_app(client):
+    """Test that an app configured with a Redis client keeps its sessions there."""
+    redis = FakeRedis()
+    redis_app = create_app({"SESSION_BACKEND": "redis", "SESSION_REDIS": redis, "SECRET_KEY": "test_secret"})
+    redis_app.config["TESTING"] = True
+
+    with redis_app.test_client() as redis_client:
+        assert login(redis_client, "redisuser").status_code == 302
+        assert redis_client.get("/api/tasks").status_code == 200
+        [key] = redis.values
+        assert key == "gogitracker:session:" + redis_client.get_cookie("session").value
@@ -0,0 +1,189 @@
+import io
+
+from sqlalchemy import event
+
+from app.wsgi import app
+from app.server import db
+from app.task_io import fold_ics_line, iter_csv, iter_ics
+from conftest import login
+
+
+# --------------- Export Tests ---------------
+
+def test_export_requires_login(client):
+    """Ensure exports redirect to login when not authenticated."""
+    assert client.get("/export.csv").status_code == 302
+    assert client.get("/export.ics").status_code == 302
+
+
+def test_export_csv_streams_all_tasks(client):
+    """Test that the CSV export streams every task of the user, ordered by date."""
+    login(client)
+    client.post("/api/tasks/batch", json={"tasks": [
+        {"date": "2024-03-01", "task_text": "Later, with a comma"},
+        {"date": "2024-02-01", "task_text": "Earlier", "status": "Done"},
+    ]})
+
+    response = client.get("/export.csv")
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "text/csv"
+    assert response.headers["Content-Disposition"] == 'attachment; filename="tasks.csv"'
+    assert response.get_data(as_text=True).splitlines() == [
+        "id,date,task_text,status",
+        "2,2024-02-01,Earlier,Done",
+        '1,2024-03-01,"Later, with a comma",In Progress',
+    ]
+
+
+def test_export_ics_streams_todos(client):
+    """Test that the iCalendar export has one all-day VTODO per task with escaped text."""
+    login(client)
+    client.post("/api/tasks", json={"date": "2024-02-01", "task_text": "Write report; part 1", "status": "Done"})
+
+    response = client.get("/export.ics")
+
+    assert response.is_streamed
+    assert response.mimetype == "text/calendar"
+    body = response.get_data(as_text=True)
+    assert body.startswith("BEGIN:VCALENDAR\r\n") and body.endswith("END:VCALENDAR\r\n")
+    assert "DTSTART;VALUE=DATE:20240201\r\n" in body
+    assert "SUMMARY:Write report\\; part 1\r\n" in body
+    assert "STATUS:COMPLETED\r\n" in body
+
+
+def test_export_header_sent_before_rows_are_read():
+    """Test that the CSV header and the calendar preamble come before the first row is fetched."""
+    def unread_rows():
+        raise AssertionError("rows read before the header was sent")
+        yield
+
+    assert next(iter_csv(unread_rows())) == "id,date,task_text,status\r\n"
+    assert next(iter_ics(unread_rows())).startswith("BEGIN:VCALENDAR\r\n")
+
+
+def test_fold_ics_line():
+    """Test that long lines are folded at 75 octets without splitting characters."""
+    folded = fold_ics_line("SUMMARY:" + "ж" * 60)
+    lines = folded.split("\r\n")[:-1]
+    assert all(len(line.encode()) <= 75 for line in lines)
+    assert "".join(line[1:] if i else line for i, line in enumerate(lines)) == "SUMMARY:" + "ж" * 60
+
+
+# --------------- Import Tests ---------------
+
+def test_import_csv_reports_invalid_rows(client):
+    """Test that valid CSV rows are imported and invalid ones reported by line."""
+    login(client)
+    csv_file = (
+        "date,task_text,status\n"
+        "2024-02-01,First,In Progress\n"
+        "01/02/2024,Bad date,In Progress\n"
+        "2024-02-02,Second,Done\n"
+        "2024-02-03,,In Progress\n"
+    )
+
+    response = client.post("/api/tasks/import", data={"file": (io.BytesIO(csv_file.encode()), "tasks.csv")})
+
+    assert response.status_code == 200
+    assert response.get_json() == {
+        "imported": 2,
+        "error_count": 2,
+        "errors": [
+            {"line": 3, "error": "'date' must be a date in YYYY-MM-DD format."},
+            {"line": 5, "error": "'task_text' cannot be empty."},
+        ],
+    }
+    tasks = client.get("/api/tasks").get_json()["tasks"]
+    assert [(t["date"], t["task_text"], t["status"]) for t in tasks] == [
+        ("2024-02-01", "First", "In Progress"), ("2024-02-02", "Second", "Done")
+    ]
+
+
+def test_import_rejects_unknown_format(client):
+    """Test that a file without a recognizable format or header is rejected."""
+    login(client)
+    assert client.post("/api/tasks/import", data="a,b\n1,2\n").status_code == 400
+    assert client.post("/api/tasks/import?format=csv", data="a,b\n1,2\n", content_type="text/csv").status_code == 400
+
+
+def test_import_reports_progress_when_file_becomes_unreadable(client):
+    """Test that an undecodable line stops the import after the rows before it, reporting both."""
+    login(client)
+    csv_file = b"date,task_text\n2024-02-01,First\n2024-02-02,Second\n2024-02-03,Caf\xe9\n2024-02-04,Last\n"
+
+    response = client.post("/api/tasks/import?format=csv", data=csv_file, content_type="text/csv")
+
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body["error"].startswith("Could not read the file:")
+    assert (body["imported"], body["line"]) == (2, 4)
+    assert [t["task_text"] for t in client.get("/api/tasks").get_json()["tasks"]] == ["First", "Second"]
+
+
+def test_import_reports_ics_line_that_cannot_be_read(client):
+    """Test that an undecodable iCalendar line is reported with the tasks imported before it."""
+    login(client)
+    ics_file = (b"BEGIN:VCALENDAR\r\nBEGIN:VTODO\r\nDTSTART;VALUE=DATE:20240201\r\nSUMMARY:First\r\n"
+                b"END:VTODO\r\nBEGIN:VTODO\r\nSUMMARY:\xff\r\nEND:VTODO\r\nEND:VCALENDAR\r\n")
+
+    response = client.post("/api/tasks/import", data=ics_file, content_type="text/calendar")
+
+    assert response.status_code == 400
+    assert {key: response.get_json()[key] for key in ("imported", "line")} == {"imported": 1, "line": 7}
+
+
+def test_export_ics_import_round_trip(client):
+    """Test that an iCalendar export imports back into the same tasks."""
+    login(client, "exporter")
+    client.post("/api/tasks/batch", json={"tasks": [
+        {"date": "2024-02-01", "task_text": "Long, escaped; summary " * 5},
+        {"date": "2024-02-02", "task_text": "Done task", "status": "Done"},
+    ]})
+    exported = client.get("/export.ics").get_data()
+    client.get("/logout")
+
+    login(client, "importer")
+    response = client.post("/api/tasks/import", data=exported, content_type="text/calendar")
+
+    assert response.get_json()["imported"] == 2
+    tasks = client.get("/api/tasks").get_json()["tasks"]
+    assert [(t["date"], t["task_text"], t["status"]) for t in tasks] == [
+        ("2024-02-01", "Long, escaped; summary " * 5, "In Progress"), ("2024-02-02", "Done task", "Done")
+    ]
+
+
+def test_import_tasks_command_inserts_in_chunks(client, tmp_path):
+    """Test the import-tasks CLI command with several insert chunks."""
+    login(client, "cliuser")
+    path = tmp_path / "tasks.csv"
+    path.write_text("date,task_text\n" + "".join(f"2024-02-{day:02d},Task {day}\n" for day in range(1, 6)))
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            result = app.test_cli_runner().invoke(args=["import-tasks", "cliuser", str(path), "--chunk-size", "2"])
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+
+    assert result.exit_code == 0, result.output
+    assert "Imported 5 task(s), skipped 0 invalid row(s)." in result.output
+    assert len([s for s in statements if s.startswith("INSERT INTO task")]) == 3
+    assert len(client.get("/api/tasks").get_json()["tasks"]) == 5
+
+
+def test_import_tasks_command_reports_unreadable_line(client, tmp_path):
+    """Test that the import-tasks CLI command fails with the line reading stopped at and the imported count."""
+    login(client, "cliuser")
+    path = tmp_path / "tasks.csv"
+    path.write_bytes(b"date,task_text\n2024-02-01,First\n2024-02-02,\xff\n")
+
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=["import-tasks", "cliuser", str(path)])
+
+    assert result.exit_code == 1
+    assert "Imported 1 task(s), skipped 0 invalid row(s)." in result.output
+    assert "line 3: Could not read the file:" in result.output